@@ -0,0 +1 @@
+"""Benchmarks package. Run modules with `python -m benchmarks.<name>` from `backend/`."""
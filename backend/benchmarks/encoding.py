@@ -0,0 +1,91 @@
+"""
+Encode CPU cost vs bytes saved for todo list responses.
+
+Usage (from `backend/`):
+    python -m benchmarks.encoding [--repeat 50]
+
+For list pages of increasing size, prints the body size and per-response
+encode time of JSON and MessagePack, each raw and with gzip/brotli at a few
+levels. Use it to pick COMPRESSION_MINIMUM_SIZE and the gzip/brotli levels:
+below the size where compression saves meaningful bytes, its CPU cost is
+pure overhead.
+"""
+
+import argparse
+import gzip
+import json
+import time
+from datetime import datetime, timedelta
+
+import brotli
+import msgpack
+
+try:
+    # Test-friendly imports (when importing `backend.benchmarks.encoding`)
+    from backend.models.schemas import SubtaskItem, TodoListResponse, TodoResponse
+except ModuleNotFoundError:
+    # Docker/entrypoint-friendly imports (when running from within `/app`)
+    from models.schemas import SubtaskItem, TodoListResponse, TodoResponse
+
+PAGE_SIZES = (1, 5, 20, 50, 100)
+
+CODECS = {
+    "raw": lambda b: b,
+    "gzip-1": lambda b: gzip.compress(b, compresslevel=1, mtime=0),
+    "gzip-6": lambda b: gzip.compress(b, compresslevel=6, mtime=0),
+    "br-1": lambda b: brotli.compress(b, quality=1),
+    "br-4": lambda b: brotli.compress(b, quality=4),
+    "br-11": lambda b: brotli.compress(b, quality=11),
+}
+
+
+def _page(n: int) -> dict:
+    now = datetime(2024, 1, 1)
+    todos = [
+        TodoResponse(
+            id=f"65a1b2c3d4e5f6a7b8c9{i:04x}",
+            title=f"Prepare quarterly report section {i}",
+            description="Collect numbers from finance, draft the summary and review it. " * (i % 4),
+            completed=i % 3 == 0,
+            priority=("low", "medium", "high")[i % 3],
+            category=f"Work {i % 5}",
+            due_date=(now + timedelta(days=i)).isoformat(),
+            created_at=(now + timedelta(minutes=i)).isoformat(),
+            updated_at=(now + timedelta(minutes=i)).isoformat(),
+            status="pending",
+            subtasks=[SubtaskItem(id=f"s{j}", title=f"Step {j}") for j in range(i % 5)],
+        )
+        for i in range(n)
+    ]
+    return TodoListResponse(todos=todos, total=n).model_dump()
+
+
+def _time_us(fn, repeat: int) -> tuple[bytes, float]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return out, (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Encode cost vs bytes saved.")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    serializers = {
+        "json": lambda c: json.dumps(c, separators=(",", ":")).encode(),
+        "msgpack": lambda c: msgpack.packb(c, use_bin_type=True),
+    }
+    print(f"{'todos':>5} {'format':>8} {'codec':>7} {'bytes':>8} {'saved':>6} {'encode_us':>10}")
+    for n in PAGE_SIZES:
+        content = _page(n)
+        for fmt, serialize in serializers.items():
+            body, ser_us = _time_us(lambda: serialize(content), args.repeat)
+            for codec, compress in CODECS.items():
+                out, comp_us = _time_us(lambda: compress(body), args.repeat)
+                saved = 1 - len(out) / len(body)
+                print(f"{n:>5} {fmt:>8} {codec:>7} {len(out):>8} {saved:>6.0%} {ser_us + comp_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Run the same repository workload against every storage engine.
+
+Usage (from `backend/`):
+    python -m benchmarks.storage_engines [--engines memory,sqlite,mongo] [--todos 2000]
+
+Each engine goes through the queries the routers issue (create, list pages,
+search, update, toggle, delete, session revocation, todo history) and is
+checked for identical results, so this
+doubles as a conformance check when adding or changing an engine. The mongo
+engine is skipped when the configured MongoDB is unreachable.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+try:
+    # Test-friendly imports (when importing `backend.benchmarks.storage_engines`)
+    from backend.config import settings
+    from backend.storage import StorageEngine, TodoFilter, create_storage
+    from backend.storage.base import due_sort, new_id
+except ModuleNotFoundError:
+    # Docker/entrypoint-friendly imports (when running from within `/app`)
+    from config import settings
+    from storage import StorageEngine, TodoFilter, create_storage
+    from storage.base import due_sort, new_id
+
+
+def _todo_doc(user_id: str, i: int, now: datetime) -> dict:
+    due_date = now + timedelta(days=i % 30) if i % 10 else None
+    return {
+        "user_id": user_id,
+        "title": f"Task {i}",
+        "description": "weekly report" if i % 7 == 0 else "",
+        "completed": i % 3 == 0,
+        "priority": ("low", "medium", "high")[i % 3],
+        "priority_rank": i % 3 + 1,
+        "category": f"List {i % 5}",
+        "due_date": due_date,
+        "due_sort": due_sort(due_date),
+        "status": "completed" if i % 3 == 0 else "pending",
+        "subtasks": [{"id": "s1", "title": "step", "completed": False}],
+        "created_at": now + timedelta(seconds=i),
+        "updated_at": now + timedelta(seconds=i),
+        "deleted_at": None,
+    }
+
+
+def _event(user_id: str, todo_id: str, i: int, now: datetime) -> dict:
+    # Pairs of events share a timestamp so paging has to break ties by id.
+    at = now + timedelta(seconds=i // 2)
+    return {
+        "_id": new_id(),
+        "user_id": user_id,
+        "todo_id": todo_id,
+        "action": "update",
+        "changes": {"title": f"Rename {i}"},
+        "previous": None,
+        "at": at,
+        "expires_at": at + timedelta(days=90),
+    }
+
+
+async def _timed(label: str, timings: dict, coro):
+    start = time.perf_counter()
+    result = await coro
+    timings[label] = timings.get(label, 0.0) + (time.perf_counter() - start)
+    return result
+
+
+async def run_workload(storage: StorageEngine, n_todos: int) -> tuple[dict, dict]:
+    """Run the workload; return (timings in seconds, observable results for comparison)."""
+    await storage.migrate(report=lambda _: None)
+    timings: dict = {}
+    results: dict = {}
+    now = datetime.utcnow().replace(microsecond=0)
+    stamp = int(time.time() * 1000)
+
+    user_id = await storage.users.insert({
+        "username": f"bench{stamp}",
+        "email": f"bench{stamp}@example.com",
+        "password": "x",
+        "created_at": now,
+        "updated_at": now,
+    })
+    found = await storage.users.find_by_email_or_username(f"BENCH{stamp}@example.com", "nobody")
+    results["user_lookup"] = found is not None
+
+    ids = []
+    for i in range(n_todos):
+        ids.append(await _timed("insert", timings, storage.todos.insert(_todo_doc(user_id, i, now))))
+
+    for skip in range(0, min(n_todos, 500), 50):
+        items, total = await _timed(
+            "list_page", timings, storage.todos.list(user_id, TodoFilter(), skip=skip, limit=50)
+        )
+    results["list_total"] = total
+    results["first_page"] = [
+        d["title"] for d in (await storage.todos.list(user_id, TodoFilter(), skip=0, limit=5))[0]
+    ]
+
+    for sort in ("due_date", "priority", "updated_at"):
+        for descending in (False, True):
+            items, _ = await _timed(
+                "sorted_page", timings,
+                storage.todos.list(user_id, TodoFilter(), skip=50, limit=20, sort=sort, descending=descending),
+            )
+            results[f"sort_{sort}_{descending}"] = [d["title"] for d in items]
+
+    for _ in range(20):
+        upcoming = await _timed(
+            "upcoming", timings,
+            storage.todos.list_due(user_id, now, now + timedelta(days=7), 20),
+        )
+    results["upcoming"] = [d["title"] for d in upcoming]
+    results["overdue"] = [
+        d["title"] for d in await storage.todos.list_due(user_id, None, now + timedelta(days=2), 20)
+    ]
+
+    items, total = await _timed(
+        "search", timings,
+        storage.todos.list(user_id, TodoFilter(search="REPORT"), skip=0, limit=50),
+    )
+    results["search_total"] = total
+
+    items, total = await _timed(
+        "filter", timings,
+        storage.todos.list(user_id, TodoFilter(completed=False, priority="high"), skip=0, limit=50),
+    )
+    results["filter_total"] = total
+
+    for todo_id in ids[:200]:
+        await _timed("update", timings, storage.todos.update(
+            user_id, todo_id, {"title": "Renamed", "updated_at": datetime.utcnow()}
+        ))
+        await _timed("toggle", timings, storage.todos.update(
+            user_id, todo_id, {"completed": True, "updated_at": datetime.utcnow()}
+        ))
+    for todo_id in ids[:100]:
+        await _timed("delete", timings, storage.todos.soft_delete(user_id, todo_id, datetime.utcnow()))
+
+    results["after_delete_total"] = (
+        await storage.todos.list(user_id, TodoFilter(), skip=0, limit=1)
+    )[1]
+    results["missing_get"] = await storage.todos.get(user_id, "not-an-id")
+    results["foreign_get"] = await storage.todos.get("0" * 24, ids[150])
+
+    await _run_revocations(storage, user_id, now, timings, results)
+    await _run_history(storage, user_id, ids[150], now, timings, results)
+    return timings, results
+
+
+async def _run_revocations(
+    storage: StorageEngine, user_id: str, now: datetime, timings: dict, results: dict
+) -> None:
+    # Revoked ids are random per run: a shared database keeps earlier runs' rows.
+    jtis = [new_id() for _ in range(100)]
+    for i, jti in enumerate(jtis):
+        await _timed("revoke", timings, storage.revocations.revoke(
+            jti, user_id, now + timedelta(hours=1 + i % 2)
+        ))
+    # Revoking again keeps the later expiry.
+    for jti in jtis[:10]:
+        await storage.revocations.revoke(jti, user_id, now + timedelta(hours=3))
+    await _timed("revoke", timings, storage.revocations.revoke_all(
+        user_id, now, now + timedelta(hours=1)
+    ))
+    await storage.revocations.revoke_all(user_id, now - timedelta(minutes=5), now + timedelta(hours=2))
+
+    entries = await _timed("changes_since", timings, storage.revocations.changes_since(None))
+    mine = [e for e in entries if str(e["user_id"]) == user_id]
+    order = {jti: i for i, jti in enumerate(jtis)}
+    results["revoked_jtis"] = sorted(
+        (order[e["jti"]], e["expires_at"]) for e in mine if e["jti"] is not None
+    )
+    results["revoked_all"] = [
+        (e["issued_before"], e["expires_at"]) for e in mine if e["jti"] is None
+    ]
+    recent = await _timed(
+        "changes_since", timings,
+        storage.revocations.changes_since(datetime.utcnow() - timedelta(minutes=1)),
+    )
+    results["revoked_recent"] = len([e for e in recent if str(e["user_id"]) == user_id])
+
+
+async def _run_history(
+    storage: StorageEngine, user_id: str, todo_id: str, now: datetime, timings: dict, results: dict
+) -> None:
+    events = [_event(user_id, todo_id, i, now) for i in range(300)]
+    for start in range(0, len(events), 50):
+        await _timed("insert_events", timings, storage.events.insert_many(events[start:start + 50]))
+    # A retried batch (half already stored) must not duplicate events.
+    await _timed("insert_events", timings, storage.events.insert_many(
+        events[275:] + [_event(user_id, todo_id, i, now) for i in range(300, 310)]
+    ))
+
+    pages, before, before_id = [], None, None
+    while True:
+        page = await _timed("history_page", timings, storage.events.list_for_todo(
+            user_id, todo_id, 25, before=before, before_id=before_id
+        ))
+        if not page:
+            break
+        pages.append([e["changes"]["title"] for e in page])
+        before, before_id = page[-1]["at"], page[-1]["_id"]
+    results["history_pages"] = pages
+    results["history_before"] = [
+        e["changes"]["title"]
+        for e in await storage.events.list_for_todo(
+            user_id, todo_id, 5, before=now + timedelta(seconds=10)
+        )
+    ]
+    results["history_foreign"] = await storage.events.list_for_todo("0" * 24, todo_id, 5)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--engines", default="memory,sqlite,mongo")
+    parser.add_argument("--todos", type=int, default=2000)
+    args = parser.parse_args()
+
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.sqlite_path = os.path.join(tmp, "bench.db")
+        for name in args.engines.split(","):
+            storage = await create_storage(name)
+            try:
+                await storage.ensure_available()
+                timings, results = await run_workload(storage, args.todos)
+            except RuntimeError as e:
+                print(f"{name:>8}: skipped ({e})")
+                continue
+            finally:
+                await storage.close()
+
+            summary = "  ".join(f"{k}={v * 1000:.1f}ms" for k, v in timings.items())
+            print(f"{name:>8}: {summary}")
+            if baseline is None:
+                baseline = results
+            elif results != baseline:
+                print(f"{name:>8}: RESULTS DIFFER: {results} != {baseline}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,9 @@
 """Configuration and settings."""
 
 from pathlib import Path
+from typing import Literal
+
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,9 +12,75 @@ class Settings(BaseSettings):
 
     mongodb_url: str = "mongodb://localhost:27017"
     database_name: str = "taskflow"
+    mongo_max_pool_size: int = 10
+    # Read preference for read-only todo queries (list/search, upcoming/overdue).
+    # Writes, read-before-write lookups and auth always use the primary.
+    # max staleness must be >= 90 (MongoDB minimum) or -1 for no limit.
+    mongo_read_preference: Literal[
+        "primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"
+    ] = "primary"
+    mongo_max_staleness_seconds: int = -1
+    # After a user writes, the worker that handled the write serves their reads
+    # from the primary for this long. Best effort only: state is per worker, so
+    # with several workers and no sticky routing a read right after a write can
+    # still hit a secondary up to `mongo_max_staleness_seconds` behind.
+    mongo_read_your_writes_seconds: float = 5.0
     jwt_secret: str = "your-secret-key-minimum-32-characters-long"
     jwt_algorithm: str = "HS256"
     jwt_expiry_days: int = 7
+    # Each worker re-reads revoked sessions this often; a logout on another
+    # worker takes effect here within this many seconds.
+    revocation_refresh_seconds: float = 5.0
+
+    # Storage engine: "mongo" (default), "sqlite" (single-node, embedded file)
+    # or "memory" (ephemeral, for local development and benchmarks).
+    storage_engine: Literal["mongo", "sqlite", "memory"] = "mongo"
+    sqlite_path: str = "taskflow.db"
+
+    # Admission control. Authenticated routes are limited per JWT user_id,
+    # auth routes (bcrypt) per client IP. "sqlite" shares buckets between the
+    # workers of one container. In-flight cap 0 = twice the Mongo pool size.
+    rate_limit_enabled: bool = True
+    rate_limit_user_rps: float = 10.0
+    rate_limit_user_burst: float = 40.0
+    rate_limit_auth_rps: float = 0.2
+    rate_limit_auth_burst: float = 5.0
+    rate_limit_store: Literal["memory", "sqlite"] = "memory"
+    rate_limit_sqlite_path: str = "/tmp/taskflow-ratelimit.db"
+    max_inflight_requests: int = 0
+    # Reverse proxies in front of the app that append to X-Forwarded-For;
+    # 0 ignores the header (clients can put anything in it).
+    trusted_proxy_hops: int = 0
+
+    # Response compression (gzip/brotli, negotiated via Accept-Encoding).
+    # Bodies below the threshold are sent as-is; tune with benchmarks/encoding.py.
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+
+    # Write-behind coalescing of todo updates (opt-in): buffered per worker for
+    # `write_coalesce_window_ms` and written as one unordered bulk write.
+    write_coalescing: bool = False
+    write_coalesce_window_ms: int = 50
+    write_coalesce_max_batch: int = 500
+
+    # Todo change history (`todo_events`). Handlers enqueue events; a background
+    # task writes them in batches. On a full queue a handler waits up to
+    # `audit_enqueue_timeout_ms`, then the event is dropped and counted.
+    audit_log_enabled: bool = True
+    audit_queue_size: int = 10000
+    audit_batch_size: int = 500
+    audit_flush_interval_ms: int = 200
+    audit_enqueue_timeout_ms: int = 100
+    audit_retention_days: int = 90
+
+    @field_validator("mongo_max_staleness_seconds")
+    @classmethod
+    def _check_max_staleness(cls, value: int) -> int:
+        # Anything else would fail server selection on every routed read.
+        if value != -1 and value < 90:
+            raise ValueError("must be -1 (no limit) or at least 90 seconds")
+        return value
 
     model_config = SettingsConfigDict(
         env_file=Path(__file__).parent / ".env",
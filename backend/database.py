@@ -5,6 +5,12 @@ import time
 
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import MongoClient
+from pymongo.read_preferences import (
+    Nearest,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+)
 
 try:
     # Test-friendly imports (when importing `backend.*` as a package)
@@ -30,11 +36,36 @@ async def get_database():
             settings.mongodb_url,
             serverSelectionTimeoutMS=5000,
             connectTimeoutMS=5000,
-            maxPoolSize=10,
+            maxPoolSize=settings.mongo_max_pool_size,
         )
     return client[settings.database_name]
 
 
+def get_read_preference():
+    """
+    Read preference for read-only queries, from `settings.mongo_read_preference`.
+    None for "primary": reads stay on the default (primary) handle.
+    """
+    mode = settings.mongo_read_preference
+    if mode == "primary":
+        return None
+    modes = {
+        "primaryPreferred": PrimaryPreferred,
+        "secondary": Secondary,
+        "secondaryPreferred": SecondaryPreferred,
+        "nearest": Nearest,
+    }
+    return modes[mode](max_staleness=settings.mongo_max_staleness_seconds)
+
+
+def close_database() -> None:
+    """Close the shared Motor client (called on shutdown)."""
+    global client
+    if client is not None:
+        client.close()
+        client = None
+
+
 def get_users_collection(db):
     """Get users collection."""
     return db["users"]
@@ -45,24 +76,14 @@ def get_todos_collection(db):
     return db["todos"]
 
 
-async def init_indexes() -> None:
-    """Create required indexes on startup."""
-    try:
-        db = await get_database()
-        users = get_users_collection(db)
-        todos = get_todos_collection(db)
-
-        await users.create_index("email", unique=True)
-        await users.create_index("username", unique=True)
-        await todos.create_index("user_id")
-        await todos.create_index("created_at")
-        await todos.create_index("deleted_at")
-        print("MongoDB indexes created successfully")
-    except Exception as e:
-        # Keep warning ASCII-only to avoid Windows console encoding crashes.
-        print(f"Warning: Could not create indexes: {e}")
-        print("Server will start, but indexes may need to be created manually.")
-        # Don't raise - allow server to start even if MongoDB connection fails
+def get_revoked_tokens_collection(db):
+    """Get revoked_tokens collection."""
+    return db["revoked_tokens"]
+
+
+def get_todo_events_collection(db):
+    """Get todo_events collection."""
+    return db["todo_events"]
 
 
 async def ensure_mongo_available(
@@ -12,12 +12,24 @@ from pymongo.errors import ServerSelectionTimeoutError
 
 try:
     # Test-friendly imports (when importing `backend.main` as a module)
-    from backend.database import init_indexes
+    from backend.config import settings
+    from backend.migrate import check_schema_version
     from backend.routers import auth, todos, health
+    from backend.storage import close_storage, flush_writes, get_storage
+    from backend.utils.admission import AdmissionControlMiddleware
+    from backend.utils.audit import audit_log
+    from backend.utils.negotiation import CompressionMiddleware
+    from backend.utils.revocation import revocation_list
 except ModuleNotFoundError:
     # Docker/entrypoint-friendly imports (when running from within `/app`)
-    from database import init_indexes
+    from config import settings
+    from migrate import check_schema_version
     from routers import auth, todos, health
+    from storage import close_storage, flush_writes, get_storage
+    from utils.admission import AdmissionControlMiddleware
+    from utils.audit import audit_log
+    from utils.negotiation import CompressionMiddleware
+    from utils.revocation import revocation_list
 
 # Custom exception handler for consistent { error: string } format
 
@@ -61,9 +73,22 @@ async def server_selection_timeout_handler(
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Startup: create indexes. Shutdown: nothing."""
-    await init_indexes()
+    """
+    Startup: open the storage engine, check the schema version (indexes
+    are created by `python migrate.py`, not by every worker), load the
+    revoked-session list and start the todo history writer. Shutdown: stop
+    the refresh, flush coalesced writes and queued history events, then
+    close the engine.
+    """
+    storage = await get_storage()
+    await check_schema_version(storage)
+    await revocation_list.start(storage.revocations, settings.revocation_refresh_seconds)
+    await audit_log.start(storage.events)
     yield
+    await revocation_list.stop()
+    await flush_writes()
+    await audit_log.stop()
+    await close_storage()
 
 
 app = FastAPI(
@@ -78,6 +103,19 @@ app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(ServerSelectionTimeoutError, server_selection_timeout_handler)
 
+# Compress large JSON/MessagePack responses for clients that accept gzip/br.
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+)
+
+# Admission control: shed load with 429/503 + Retry-After instead of queueing.
+# Added before CORS so rejections still carry CORS headers.
+if settings.rate_limit_enabled:
+    app.add_middleware(AdmissionControlMiddleware)
+
 # CORS: allow frontend
 app.add_middleware(
     CORSMiddleware,
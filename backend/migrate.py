@@ -0,0 +1,76 @@
+"""
+Schema migrations: create missing indexes and record the schema version.
+
+Run once per deploy (the Docker entrypoint does this before starting
+gunicorn) instead of from every worker:
+
+    python migrate.py           # apply missing indexes, record SCHEMA_VERSION
+    python migrate.py --check   # list what is missing; exit 1 if not up to date
+"""
+
+import argparse
+import asyncio
+import sys
+
+try:
+    # Test-friendly imports (when importing `backend.migrate`)
+    from backend.storage import StorageEngine, get_storage
+    from backend.storage.base import SCHEMA_VERSION
+except ModuleNotFoundError:
+    # Docker/entrypoint-friendly imports (when running from within `/app`)
+    from storage import StorageEngine, get_storage
+    from storage.base import SCHEMA_VERSION
+
+
+async def check_schema_version(storage: StorageEngine, timeout: float = 2.0) -> None:
+    """
+    Cheap startup check for workers: one lookup of the recorded version.
+    Only warns; never blocks startup on a slow or unreachable database.
+    """
+    try:
+        applied = await asyncio.wait_for(storage.schema_version(), timeout=timeout)
+    except Exception as e:
+        # Keep warning ASCII-only to avoid Windows console encoding crashes.
+        print(f"Warning: Could not check schema version: {e}")
+        return
+    if applied < SCHEMA_VERSION:
+        print(
+            f"Warning: database schema is at version {applied}, expected {SCHEMA_VERSION}. "
+            "Run `python migrate.py` to create missing indexes."
+        )
+
+
+async def run(check_only: bool) -> int:
+    storage = await get_storage()
+    try:
+        try:
+            await storage.ensure_available()
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            return 2
+        applied = await storage.schema_version()
+        print(f"Storage engine: {storage.name}; schema version {applied} -> {SCHEMA_VERSION}")
+        steps = await storage.migrate(dry_run=check_only)
+        if check_only:
+            up_to_date = not steps and applied >= SCHEMA_VERSION
+            print("Up to date" if up_to_date else "Migration required")
+            return 0 if up_to_date else 1
+        print(f"Applied {len(steps)} step(s); schema version is now {SCHEMA_VERSION}")
+        return 0
+    finally:
+        await storage.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply TaskFlow schema migrations.")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="only report missing indexes; exit 1 if a migration is required",
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.check)))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,9 @@ from typing import Literal, Optional
 from pydantic import BaseModel, EmailStr, Field
 
 TodoStatus = Literal["pending", "in_progress", "completed"]
+TodoSortField = Literal["created_at", "updated_at", "due_date", "priority"]
+SortOrder = Literal["asc", "desc"]
+TodoEventAction = Literal["create", "update", "toggle", "delete"]
 
 
 class SubtaskItem(BaseModel):
@@ -49,6 +52,12 @@ class RegisterSuccessResponse(BaseModel):
     message: str = "User created successfully"
 
 
+class LogoutResponse(BaseModel):
+    """Logout / logout-all success response."""
+    success: bool = True
+    message: str = "Logged out"
+
+
 # ----- Todos -----
 
 class TodoCreate(BaseModel):
@@ -96,6 +105,27 @@ class TodoListResponse(BaseModel):
     total: int
 
 
+class TodoDueListResponse(BaseModel):
+    """Upcoming/overdue todos, soonest first. No total (kept cheap to poll)."""
+    todos: list[TodoResponse]
+    has_more: bool
+
+
+class TodoEventResponse(BaseModel):
+    """One entry of a todo's change history."""
+    id: str
+    action: TodoEventAction
+    changes: dict
+    previous: Optional[dict] = None
+    at: str
+
+
+class TodoHistoryResponse(BaseModel):
+    """Change history of a todo, newest first."""
+    events: list[TodoEventResponse]
+    has_more: bool
+
+
 class ToggleCompleteBody(BaseModel):
     """Body for PATCH toggle-complete."""
     completed: bool
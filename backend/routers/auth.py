@@ -1,24 +1,23 @@
-"""Authentication routes: register, login."""
+"""Authentication routes: register, login, logout."""
 
 import asyncio
+from datetime import datetime, timedelta
 
-from fastapi import APIRouter, HTTPException, status
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi import APIRouter, Depends, HTTPException, status
 
 try:
     # Test-friendly imports (when importing `backend.routers.auth`)
-    from backend.database import (
-        ensure_mongo_available,
-        get_database,
-        get_users_collection,
-    )
+    from backend.config import settings
+    from backend.storage import get_storage
 except ModuleNotFoundError:
     # Docker/entrypoint-friendly imports (when running from within `/app`)
-    from database import ensure_mongo_available, get_database, get_users_collection
+    from config import settings
+    from storage import get_storage
 try:
     # Test-friendly imports (when importing `backend.routers.auth`)
     from backend.models.schemas import (
         LoginRequest,
+        LogoutResponse,
         RegisterSuccessResponse,
         TokenResponse,
         UserCreate,
@@ -29,16 +28,21 @@ try:
         hash_password,
         verify_password,
     )
+    from backend.utils.deps import get_current_user, get_token_payload
+    from backend.utils.revocation import revocation_list
 except ModuleNotFoundError:
     # Docker/entrypoint-friendly imports (when running from within `/app`)
     from models.schemas import (
         LoginRequest,
+        LogoutResponse,
         RegisterSuccessResponse,
         TokenResponse,
         UserCreate,
         UserResponse,
     )
     from utils.auth import create_access_token, hash_password, verify_password
+    from utils.deps import get_current_user, get_token_payload
+    from utils.revocation import revocation_list
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -49,37 +53,22 @@ async def register(body: UserCreate) -> RegisterSuccessResponse:
     Register a new user.
     Returns 201 on success, 409 if email or username already exists.
     """
+    storage = await get_storage()
     try:
-        await ensure_mongo_available(use_cache=False)
+        await storage.ensure_available()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Database connection failed",
         ) from e
 
-    db: AsyncIOMotorDatabase = await get_database()
-    users = get_users_collection(db)
-
     email_lower = body.email.lower()
     username_lower = body.username.lower()
 
     # Check for existing email or username (case-insensitive)
     try:
         existing = await asyncio.wait_for(
-            users.find_one(
-                {
-                    "$or": [
-                        {"email": {"$regex": f"^{email_lower}$", "$options": "i"}},
-                        {
-                            "username": {
-                                "$regex": f"^{username_lower}$",
-                                "$options": "i",
-                            }
-                        },
-                    ]
-                },
-                max_time_ms=4000,
-            ),
+            storage.users.find_by_email_or_username(email_lower, username_lower),
             timeout=6,
         )
     except asyncio.TimeoutError as e:
@@ -94,7 +83,6 @@ async def register(body: UserCreate) -> RegisterSuccessResponse:
         )
 
     hashed = hash_password(body.password)
-    from datetime import datetime
     now = datetime.utcnow()
     doc = {
         "username": body.username,
@@ -104,7 +92,7 @@ async def register(body: UserCreate) -> RegisterSuccessResponse:
         "updated_at": now,
     }
     try:
-        await asyncio.wait_for(users.insert_one(doc), timeout=6)
+        await asyncio.wait_for(storage.users.insert(doc), timeout=6)
     except asyncio.TimeoutError as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -120,20 +108,18 @@ async def login(body: LoginRequest) -> TokenResponse:
     Authenticate user and return JWT token.
     Returns 401 if invalid email or password.
     """
+    storage = await get_storage()
     try:
-        await ensure_mongo_available(use_cache=False)
+        await storage.ensure_available()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Database connection failed",
         ) from e
 
-    db: AsyncIOMotorDatabase = await get_database()
-    users = get_users_collection(db)
-
     try:
         user = await asyncio.wait_for(
-            users.find_one({"email": body.email.lower()}, max_time_ms=4000),
+            storage.users.find_by_email(body.email.lower()),
             timeout=6,
         )
     except asyncio.TimeoutError as e:
@@ -158,3 +144,55 @@ async def login(body: LoginRequest) -> TokenResponse:
             email=user["email"],
         ),
     )
+
+
+async def _revoke_all(user_id: str) -> None:
+    """Revoke every token of `user_id` issued so far, here and (after a refresh) on all workers."""
+    storage = await get_storage()
+    now = datetime.utcnow()
+    # Every token issued before `now` is dead by this time anyway.
+    expires_at = now + timedelta(days=settings.jwt_expiry_days)
+    try:
+        await asyncio.wait_for(storage.revocations.revoke_all(user_id, now, expires_at), timeout=6)
+    except asyncio.TimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database connection failed",
+        ) from e
+    revocation_list.add(
+        {"jti": None, "user_id": user_id, "issued_before": now, "expires_at": expires_at}
+    )
+
+
+@router.post("/logout", status_code=status.HTTP_200_OK)
+async def logout(
+    payload: dict = Depends(get_token_payload),
+    user_id: str = Depends(get_current_user),
+) -> LogoutResponse:
+    """
+    Revoke the token used for this request.
+    Tokens issued before revocation support (no `jti`) revoke all sessions.
+    """
+    jti = payload.get("jti")
+    if jti is None:
+        await _revoke_all(user_id)
+        return LogoutResponse()
+
+    storage = await get_storage()
+    expires_at = datetime.utcfromtimestamp(payload["exp"])
+    try:
+        await asyncio.wait_for(storage.revocations.revoke(jti, user_id, expires_at), timeout=6)
+    except asyncio.TimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database connection failed",
+        ) from e
+    revocation_list.add({"jti": jti, "user_id": user_id, "expires_at": expires_at})
+    return LogoutResponse()
+
+
+@router.post("/logout-all", status_code=status.HTTP_200_OK)
+async def logout_all(user_id: str = Depends(get_current_user)) -> LogoutResponse:
+    """Revoke every session of the current user, including this one."""
+    await _revoke_all(user_id)
+    return LogoutResponse(message="Logged out of all sessions")
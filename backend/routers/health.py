@@ -1,6 +1,13 @@
 """Health check endpoint."""
    
 from fastapi import APIRouter
+
+try:
+    # Test-friendly imports (when importing `backend.routers.health`)
+    from backend.utils.audit import audit_log
+except ModuleNotFoundError:
+    # Docker/entrypoint-friendly imports (when running from within `/app`)
+    from utils.audit import audit_log
    
 router = APIRouter()
    
@@ -10,5 +17,7 @@ async def health_check():
        """Health check endpoint for Docker and load balancers."""
        return {
            "status": "healthy",
-           "service": "taskflow-api"
+           "service": "taskflow-api",
+           # Todo history queue: overflows/dropped grow when writes fall behind.
+           "audit_log": audit_log.stats(),
        }
\ No newline at end of file
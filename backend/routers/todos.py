@@ -1,46 +1,64 @@
 """Todo CRUD routes. All require JWT authentication."""
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 
-from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from motor.motor_asyncio import AsyncIOMotorDatabase
 
 try:
     # Test-friendly imports (when importing `backend.routers.todos`)
-    from backend.database import get_database, get_todos_collection
+    from backend.storage import TodoFilter, get_storage
+    from backend.storage.base import due_sort, is_valid_id, priority_rank, to_utc_naive
 except ModuleNotFoundError:
     # Docker/entrypoint-friendly imports (when running from within `/app`)
-    from database import get_database, get_todos_collection
+    from storage import TodoFilter, get_storage
+    from storage.base import due_sort, is_valid_id, priority_rank, to_utc_naive
 try:
     # Test-friendly imports (when importing `backend.routers.todos`)
     from backend.models.schemas import (
         DeleteResponse,
+        SortOrder,
         SubtaskItem,
         TodoCreate,
+        TodoDueListResponse,
+        TodoEventResponse,
+        TodoHistoryResponse,
         TodoListResponse,
         TodoResponse,
+        TodoSortField,
         TodoUpdate,
         ToggleCompleteBody,
         ToggleCompleteResponse,
     )
+    from backend.utils.audit import audit_log
     from backend.utils.deps import get_current_user
+    from backend.utils.negotiation import NegotiatedRoute
 except ModuleNotFoundError:
     # Docker/entrypoint-friendly imports (when running from within `/app`)
     from models.schemas import (
         DeleteResponse,
+        SortOrder,
         SubtaskItem,
         TodoCreate,
+        TodoDueListResponse,
+        TodoEventResponse,
+        TodoHistoryResponse,
         TodoListResponse,
         TodoResponse,
+        TodoSortField,
         TodoUpdate,
         ToggleCompleteBody,
         ToggleCompleteResponse,
     )
+    from utils.audit import audit_log
     from utils.deps import get_current_user
+    from utils.negotiation import NegotiatedRoute
 
-router = APIRouter(prefix="/todos", tags=["todos"])
+# NegotiatedRoute: `Accept`/`Content-Type: application/msgpack` for mobile clients.
+router = APIRouter(prefix="/todos", tags=["todos"], route_class=NegotiatedRoute)
+
+# Bookkeeping fields left out of history events.
+_UNAUDITED_FIELDS = {"_id", "user_id", "priority_rank", "due_sort", "created_at", "updated_at", "deleted_at"}
 
 
 def _doc_to_subtasks(doc_list: list | None) -> list[SubtaskItem]:
@@ -54,7 +72,7 @@ def _doc_to_subtasks(doc_list: list | None) -> list[SubtaskItem]:
 
 
 def _to_response(doc: dict) -> TodoResponse:
-    """Convert MongoDB document to TodoResponse."""
+    """Convert a stored todo document to TodoResponse."""
     created = doc.get("created_at")
     updated = doc.get("updated_at")
     due = doc.get("due_date")
@@ -78,6 +96,28 @@ def _to_response(doc: dict) -> TodoResponse:
     )
 
 
+def _audited(fields: dict) -> dict:
+    """User-visible fields of a todo or an update, for history events."""
+    return {k: v for k, v in fields.items() if k not in _UNAUDITED_FIELDS}
+
+
+def _iso_values(fields: dict | None) -> dict | None:
+    if fields is None:
+        return None
+    return {k: v.isoformat() if isinstance(v, datetime) else v for k, v in fields.items()}
+
+
+def _event_to_response(event: dict) -> TodoEventResponse:
+    """Convert a stored todo event to TodoEventResponse."""
+    return TodoEventResponse(
+        id=str(event["_id"]),
+        action=event["action"],
+        changes=_iso_values(event["changes"]),
+        previous=_iso_values(event.get("previous")),
+        at=event["at"].isoformat(),
+    )
+
+
 @router.get("", status_code=status.HTTP_200_OK)
 async def list_todos(
     user_id: str = Depends(get_current_user),
@@ -87,28 +127,30 @@ async def list_todos(
     priority: Optional[str] = None,
     category: Optional[str] = None,
     search: Optional[str] = None,
+    sort: TodoSortField = "created_at",
+    order: SortOrder = "desc",
 ) -> TodoListResponse:
-    """List todos for authenticated user. Excludes soft-deleted."""
-    db: AsyncIOMotorDatabase = await get_database()
-    todos_coll = get_todos_collection(db)
-
-    query: dict = {"user_id": ObjectId(user_id), "deleted_at": None}
-
-    if completed is not None:
-        query["completed"] = completed
-    if priority:
-        query["priority"] = priority
-    if category:
-        query["category"] = category
-    if search and search.strip():
-        query["$or"] = [
-            {"title": {"$regex": search.strip(), "$options": "i"}},
-            {"description": {"$regex": search.strip(), "$options": "i"}},
-        ]
-
-    cursor = todos_coll.find(query).sort("created_at", -1).skip(skip).limit(limit)
-    total = await todos_coll.count_documents(query)
-    items = [x async for x in cursor]
+    """
+    List todos for authenticated user. Excludes soft-deleted.
+    Sorted by `sort` (created_at, updated_at, due_date, priority) in `order`;
+    todos without a due date come last in ascending due_date order.
+    """
+    storage = await get_storage()
+
+    filters = TodoFilter(
+        completed=completed,
+        priority=priority or None,
+        category=category or None,
+        search=search.strip() if search and search.strip() else None,
+    )
+    items, total = await storage.todos.list(
+        user_id,
+        filters,
+        skip=skip,
+        limit=limit,
+        sort=sort,
+        descending=order == "desc",
+    )
 
     return TodoListResponse(
         todos=[_to_response(d) for d in items],
@@ -116,14 +158,51 @@ async def list_todos(
     )
 
 
+@router.get("/upcoming", status_code=status.HTTP_200_OK)
+async def list_upcoming(
+    user_id: str = Depends(get_current_user),
+    days: int = Query(7, ge=1, le=90),
+    limit: int = Query(20, ge=1, le=100),
+) -> TodoDueListResponse:
+    """Incomplete todos due within the next `days` days, soonest first."""
+    storage = await get_storage()
+
+    now = datetime.utcnow()
+    items = await storage.todos.list_due(user_id, now, now + timedelta(days=days), limit + 1)
+    return TodoDueListResponse(
+        todos=[_to_response(d) for d in items[:limit]],
+        has_more=len(items) > limit,
+    )
+
+
+@router.get("/overdue", status_code=status.HTTP_200_OK)
+async def list_overdue(
+    user_id: str = Depends(get_current_user),
+    days: Optional[int] = Query(None, ge=1, le=365),
+    limit: int = Query(20, ge=1, le=100),
+) -> TodoDueListResponse:
+    """
+    Incomplete todos whose due date has passed, most overdue first.
+    `days` limits the window to todos that became overdue in the last N days.
+    """
+    storage = await get_storage()
+
+    now = datetime.utcnow()
+    due_after = now - timedelta(days=days) if days else None
+    items = await storage.todos.list_due(user_id, due_after, now, limit + 1)
+    return TodoDueListResponse(
+        todos=[_to_response(d) for d in items[:limit]],
+        has_more=len(items) > limit,
+    )
+
+
 @router.post("", status_code=status.HTTP_201_CREATED)
 async def create_todo(
     body: TodoCreate,
     user_id: str = Depends(get_current_user),
 ) -> TodoResponse:
     """Create a new todo for authenticated user."""
-    db: AsyncIOMotorDatabase = await get_database()
-    todos_coll = get_todos_collection(db)
+    storage = await get_storage()
 
     if not body.title or not body.title.strip():
         raise HTTPException(
@@ -148,21 +227,23 @@ async def create_todo(
     subtasks_stored = [{"id": s.id, "title": s.title, "completed": s.completed} for s in (body.subtasks or [])]
 
     doc = {
-        "user_id": ObjectId(user_id),
+        "user_id": user_id,
         "title": body.title.strip(),
         "description": (body.description or "").strip(),
         "completed": completed,
         "priority": body.priority or "medium",
+        "priority_rank": priority_rank(body.priority or "medium"),
         "category": body.category or "Uncategorized",
         "due_date": due_date,
+        "due_sort": due_sort(due_date),
         "status": status_val,
         "subtasks": subtasks_stored,
         "created_at": now,
         "updated_at": now,
         "deleted_at": None,
     }
-    result = await todos_coll.insert_one(doc)
-    doc["_id"] = result.inserted_id
+    doc["_id"] = await storage.todos.insert(doc)
+    await audit_log.record(user_id, doc["_id"], "create", _audited(doc), at=now)
 
     return _to_response(doc)
 
@@ -174,15 +255,9 @@ async def update_todo(
     user_id: str = Depends(get_current_user),
 ) -> TodoResponse:
     """Update a todo. Only owner can update."""
-    db: AsyncIOMotorDatabase = await get_database()
-    todos_coll = get_todos_collection(db)
+    storage = await get_storage()
 
-    try:
-        oid = ObjectId(todo_id)
-    except Exception:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found")
-
-    doc = await todos_coll.find_one({"_id": oid, "user_id": ObjectId(user_id), "deleted_at": None})
+    doc = await storage.todos.get(user_id, todo_id)
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found")
 
@@ -197,11 +272,13 @@ async def update_todo(
         update_data["completed"] = body.completed
     if body.priority is not None:
         update_data["priority"] = body.priority
+        update_data["priority_rank"] = priority_rank(body.priority)
     if body.category is not None:
         update_data["category"] = body.category
     if body.due_date is not None:
         try:
             update_data["due_date"] = datetime.fromisoformat(body.due_date.replace("Z", "+00:00"))
+            update_data["due_sort"] = due_sort(update_data["due_date"])
         except (ValueError, TypeError):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -217,8 +294,18 @@ async def update_todo(
         return _to_response(doc)
 
     update_data["updated_at"] = datetime.utcnow()
-    await todos_coll.update_one({"_id": oid}, {"$set": update_data})
-    updated = await todos_coll.find_one({"_id": oid})
+    updated = await storage.todos.update_doc(doc, update_data)
+    if not updated:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found")
+    changes = _audited(update_data)
+    await audit_log.record(
+        user_id,
+        todo_id,
+        "update",
+        changes,
+        previous={k: doc.get(k) for k in changes},
+        at=update_data["updated_at"],
+    )
     return _to_response(updated)
 
 
@@ -228,20 +315,15 @@ async def delete_todo(
     user_id: str = Depends(get_current_user),
 ) -> DeleteResponse:
     """Soft delete a todo. Only owner can delete."""
-    db: AsyncIOMotorDatabase = await get_database()
-    todos_coll = get_todos_collection(db)
+    storage = await get_storage()
 
-    try:
-        oid = ObjectId(todo_id)
-    except Exception:
+    now = datetime.utcnow()
+    deleted = await storage.todos.soft_delete(user_id, todo_id, now)
+    if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found")
-
-    result = await todos_coll.update_one(
-        {"_id": oid, "user_id": ObjectId(user_id), "deleted_at": None},
-        {"$set": {"deleted_at": datetime.utcnow()}},
+    await audit_log.record(
+        user_id, todo_id, "delete", {"deleted_at": now}, previous={"deleted_at": None}, at=now
     )
-    if result.matched_count == 0:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found")
 
     return DeleteResponse(success=True)
 
@@ -253,25 +335,67 @@ async def toggle_complete(
     user_id: str = Depends(get_current_user),
 ) -> ToggleCompleteResponse:
     """Toggle completed status. Only owner can update."""
-    db: AsyncIOMotorDatabase = await get_database()
-    todos_coll = get_todos_collection(db)
-
-    try:
-        oid = ObjectId(todo_id)
-    except Exception:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found")
+    storage = await get_storage()
 
     now = datetime.utcnow()
-    result = await todos_coll.update_one(
-        {"_id": oid, "user_id": ObjectId(user_id), "deleted_at": None},
-        {"$set": {"completed": body.completed, "updated_at": now}},
+    # No doc needed for the response, so a coalescing repository can skip
+    # the read for a todo this worker has just listed or fetched.
+    found = await storage.todos.set_fields(
+        user_id,
+        todo_id,
+        {"completed": body.completed, "updated_at": now},
     )
-    if result.matched_count == 0:
+    if not found:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found")
+    await audit_log.record(user_id, todo_id, "toggle", {"completed": body.completed}, at=now)
 
-    doc = await todos_coll.find_one({"_id": oid})
     return ToggleCompleteResponse(
-        id=str(doc["_id"]),
-        completed=doc["completed"],
-        updated_at=doc["updated_at"].isoformat(),
+        id=todo_id,
+        completed=body.completed,
+        updated_at=now.isoformat(),
+    )
+
+
+@router.get("/{todo_id}/history", status_code=status.HTTP_200_OK)
+async def todo_history(
+    todo_id: str,
+    user_id: str = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=100),
+    before: Optional[str] = None,
+    before_id: Optional[str] = None,
+) -> TodoHistoryResponse:
+    """
+    Change history of a todo (deleted todos included), newest first. Pass the
+    `at` and `id` of the last event as `before` and `before_id` to page
+    further back (events sharing that `at` are not skipped).
+    """
+    storage = await get_storage()
+
+    before_dt = None
+    if before:
+        try:
+            before_dt = to_utc_naive(datetime.fromisoformat(before.replace("Z", "+00:00")))
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid before format. Use ISO 8601 (e.g., 2024-12-31T23:59:59Z)",
+            )
+    if before_id is not None and (before_dt is None or not is_valid_id(before_id)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="before_id must be an event id and requires before",
+        )
+
+    # Write this worker's queued events of this todo first so a client sees
+    # its own changes (bounded; on failure, read what's stored).
+    await audit_log.flush_for(user_id, todo_id)
+
+    events = await storage.events.list_for_todo(
+        user_id, todo_id, limit + 1, before=before_dt, before_id=before_id
+    )
+    if not events and before_dt is None and not await storage.todos.get(user_id, todo_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found")
+    return TodoHistoryResponse(
+        events=[_event_to_response(e) for e in events[:limit]],
+        has_more=len(events) > limit,
     )
@@ -0,0 +1,88 @@
+"""Storage package: pluggable persistence engines selected via `Settings`."""
+
+try:
+    # Test-friendly imports (when importing `backend.storage`)
+    from backend.config import settings
+    from backend.storage.base import StorageEngine, TodoFilter
+except ModuleNotFoundError:
+    # Docker/entrypoint-friendly imports (when running from within `/app`)
+    from config import settings
+    from storage.base import StorageEngine, TodoFilter
+
+_storage: StorageEngine | None = None
+
+
+async def create_storage(engine: str) -> StorageEngine:
+    """Build a new engine by name ("mongo", "sqlite" or "memory")."""
+    if engine == "mongo":
+        try:
+            from backend.storage.mongo import MongoStorage
+        except ModuleNotFoundError:
+            from storage.mongo import MongoStorage
+        return await MongoStorage.create()
+    if engine == "sqlite":
+        try:
+            from backend.storage.sqlite import SQLiteStorage
+        except ModuleNotFoundError:
+            from storage.sqlite import SQLiteStorage
+        return SQLiteStorage(settings.sqlite_path)
+    if engine == "memory":
+        try:
+            from backend.storage.memory import MemoryStorage
+        except ModuleNotFoundError:
+            from storage.memory import MemoryStorage
+        return MemoryStorage()
+    raise ValueError(f"Unknown storage engine: {engine}")
+
+
+async def get_storage() -> StorageEngine:
+    """Get the process-wide storage engine configured by `settings.storage_engine`."""
+    global _storage
+    if _storage is None:
+        storage = await create_storage(settings.storage_engine)
+        if settings.write_coalescing:
+            try:
+                from backend.storage.coalescing import CoalescingTodoRepository
+            except ModuleNotFoundError:
+                from storage.coalescing import CoalescingTodoRepository
+            storage.todos = CoalescingTodoRepository(
+                storage.todos,
+                window_ms=settings.write_coalesce_window_ms,
+                max_batch=settings.write_coalesce_max_batch,
+            )
+        _storage = storage
+    return _storage
+
+
+async def flush_writes(timeout: float = 5.0) -> None:
+    """
+    Write out any buffered (coalesced) todo updates before shutdown,
+    retrying for up to `timeout` seconds. Logs how many were dropped.
+    """
+    if _storage is None:
+        return
+    try:
+        dropped = await _storage.todos.drain(timeout)
+    except Exception as e:
+        print(f"Warning: flushing buffered todo updates failed: {e}")
+        return
+    if dropped:
+        print(f"Error: {dropped} buffered todo update(s) could not be written and were dropped")
+
+
+async def close_storage() -> None:
+    """Close the process-wide storage engine (called on shutdown)."""
+    global _storage
+    if _storage is not None:
+        await _storage.close()
+        _storage = None
+
+
+__all__ = [
+    "StorageEngine",
+    "TodoFilter",
+    "close_storage",
+    "create_storage",
+    "flush_writes",
+    "get_storage",
+]
@@ -0,0 +1,289 @@
+"""Storage engine interfaces shared by every backend.
+
+Repositories exchange plain dicts shaped like the MongoDB documents the
+routers have always worked with (`_id`, `user_id`, `created_at`, ...), so
+`_to_response` and friends stay engine-agnostic. Ids are passed in and out
+as strings; engines that don't use ObjectIds natively still generate
+ObjectId-formatted hex ids so clients can't tell the engines apart.
+"""
+
+from __future__ import annotations
+
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+from bson import ObjectId
+
+# Bump whenever an engine gains an index or a data migration step; workers
+# compare it against the version recorded by `python migrate.py`.
+SCHEMA_VERSION = 6
+
+# A named migration step; the coroutine may return a detail for the report.
+MigrationStep = tuple[str, Callable[[], Awaitable[Optional[str]]]]
+
+# Numeric rank stored alongside the free-form `priority` so it can be sorted.
+PRIORITY_RANKS = {"low": 1, "medium": 2, "high": 3}
+
+# Stored as `due_sort` for todos without a due date, so they sort after every
+# dated todo in ascending due_date order.
+NO_DUE_DATE = datetime(9999, 12, 31)
+
+# API sort key -> stored field. Ties are broken by id in the same direction.
+SORT_FIELDS = {
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+    "due_date": "due_sort",
+    "priority": "priority_rank",
+}
+
+
+@dataclass
+class TodoFilter:
+    """Filters accepted by `TodoRepository.list`."""
+    completed: Optional[bool] = None
+    priority: Optional[str] = None
+    category: Optional[str] = None
+    search: Optional[str] = None
+
+
+def priority_rank(priority: str | None) -> int:
+    """Rank for a priority label (unknown labels rank lowest)."""
+    return PRIORITY_RANKS.get((priority or "").strip().lower(), 0)
+
+
+def due_sort(due_date: datetime | None) -> datetime:
+    """Sort key stored alongside `due_date` (`NO_DUE_DATE` when there is none)."""
+    return to_utc_naive(due_date) or NO_DUE_DATE
+
+
+def new_id() -> str:
+    """Generate a new ObjectId-formatted id."""
+    return str(ObjectId())
+
+
+def is_valid_id(value: str) -> bool:
+    """True if `value` is a well-formed ObjectId hex string."""
+    return ObjectId.is_valid(value)
+
+
+def to_utc_naive(value: datetime | None) -> datetime | None:
+    """
+    Normalize a datetime the way the Mongo driver does on round trip:
+    aware values are converted to UTC and returned naive.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class UserRepository(ABC):
+    """Queries issued by the auth routes."""
+
+    @abstractmethod
+    async def find_by_email_or_username(self, email: str, username: str) -> dict | None:
+        """Find a user whose email or username matches (case-insensitive)."""
+
+    @abstractmethod
+    async def find_by_email(self, email: str) -> dict | None:
+        """Find a user by (already lower-cased) email."""
+
+    @abstractmethod
+    async def insert(self, doc: dict) -> str:
+        """Insert a user document and return its id."""
+
+
+class TodoRepository(ABC):
+    """Queries issued by the todo routes. All lookups are scoped to an owner."""
+
+    @abstractmethod
+    async def list(
+        self,
+        user_id: str,
+        filters: TodoFilter,
+        skip: int,
+        limit: int,
+        sort: str = "created_at",
+        descending: bool = True,
+    ) -> tuple[list[dict], int]:
+        """
+        Return one page of non-deleted todos and the total count, ordered by
+        `SORT_FIELDS[sort]` then id. Todos without a due date sort after the
+        dated ones in ascending due_date order (first when descending).
+        """
+
+    @abstractmethod
+    async def list_due(
+        self,
+        user_id: str,
+        due_after: datetime | None,
+        due_before: datetime,
+        limit: int,
+    ) -> list[dict]:
+        """
+        Incomplete, non-deleted todos with `due_after <= due_date < due_before`
+        (no lower bound if `due_after` is None), soonest first. No count is
+        computed so callers can poll this cheaply.
+        """
+
+    @abstractmethod
+    async def insert(self, doc: dict) -> str:
+        """Insert a todo document and return its id."""
+
+    @abstractmethod
+    async def get(self, user_id: str, todo_id: str) -> dict | None:
+        """Fetch a non-deleted todo owned by `user_id`, or None."""
+
+    @abstractmethod
+    async def update(self, user_id: str, todo_id: str, fields: dict) -> dict | None:
+        """Set `fields` on a non-deleted owned todo and return the updated doc, or None."""
+
+    async def bulk_update(self, updates: list[tuple[str, str, dict]]) -> None:
+        """
+        Apply many `(user_id, todo_id, fields)` updates at once, in no
+        particular order. Non-matching todos are skipped silently.
+        """
+        for user_id, todo_id, fields in updates:
+            await self.update(user_id, todo_id, fields)
+
+    async def update_doc(self, doc: dict, fields: dict) -> dict | None:
+        """
+        `update` for a doc the caller has just fetched with `get` (ownership
+        already checked), so buffering repositories can skip a re-read. Ids
+        are passed on as strings (Mongo docs carry ObjectIds).
+        """
+        return await self.update(str(doc["user_id"]), str(doc["_id"]), fields)
+
+    async def set_fields(self, user_id: str, todo_id: str, fields: dict) -> bool:
+        """
+        `update` without returning the doc: False if no non-deleted owned todo
+        matched. Buffering repositories may acknowledge recently seen todos
+        without a read.
+        """
+        return await self.update(user_id, todo_id, fields) is not None
+
+    async def flush(self, raise_on_error: bool = False) -> None:
+        """Write out buffered updates (no-op unless the repository buffers writes)."""
+        return None
+
+    async def drain(self, timeout: float) -> int:
+        """
+        Flush before shutdown, retrying for up to `timeout` seconds. Returns
+        the number of buffered updates that could not be written.
+        """
+        await self.flush(raise_on_error=True)
+        return 0
+
+    @abstractmethod
+    async def soft_delete(self, user_id: str, todo_id: str, deleted_at: datetime) -> bool:
+        """Mark a non-deleted owned todo as deleted. Returns False if none matched."""
+
+
+class RevocationRepository(ABC):
+    """
+    Revoked sessions. Every worker mirrors them in memory (see
+    `utils/revocation.py`) by polling `changes_since`.
+    """
+
+    @abstractmethod
+    async def revoke(self, jti: str, user_id: str, expires_at: datetime) -> None:
+        """Revoke the token with this `jti` until it would have expired anyway."""
+
+    @abstractmethod
+    async def revoke_all(self, user_id: str, issued_before: datetime, expires_at: datetime) -> None:
+        """Revoke every token of `user_id` issued before `issued_before`."""
+
+    @abstractmethod
+    async def changes_since(self, since: datetime | None) -> list[dict]:
+        """
+        Unexpired revocations recorded at or after `since` (all of them if
+        None), as dicts with `jti` (None for `revoke_all`), `user_id`,
+        `issued_before`, `revoked_at` and `expires_at`.
+        """
+
+
+class EventRepository(ABC):
+    """
+    Append-only todo change history (`todo_events`), written in batches by
+    `utils/audit.py`. Events expire at their `expires_at`.
+    """
+
+    @abstractmethod
+    async def insert_many(self, events: list[dict]) -> None:
+        """Insert events (each with a string `_id`); ids already stored are skipped."""
+
+    @abstractmethod
+    async def list_for_todo(
+        self,
+        user_id: str,
+        todo_id: str,
+        limit: int,
+        before: datetime | None = None,
+        before_id: str | None = None,
+    ) -> list[dict]:
+        """
+        Events of one owned todo (deleted ones included), newest first by
+        (`at`, `_id`). Paging cursor: with `before_id`, events strictly before
+        (`before`, `before_id`); otherwise those with `at < before`.
+        """
+
+
+class StorageEngine(ABC):
+    """A storage backend: one repository per collection plus lifecycle hooks."""
+
+    name: str = ""
+    users: UserRepository
+    todos: TodoRepository
+    revocations: RevocationRepository
+    events: EventRepository
+
+    async def ensure_available(self) -> None:
+        """Raise RuntimeError if the backend cannot serve requests right now."""
+        return None
+
+    @abstractmethod
+    async def schema_version(self) -> int:
+        """Schema version last recorded by `migrate` (0 if never migrated)."""
+
+    @abstractmethod
+    async def pending_migrations(self) -> list[MigrationStep]:
+        """
+        Data steps newer than the recorded version, then index changes found
+        by diffing the desired indexes against the backend, in apply order.
+        """
+
+    @abstractmethod
+    async def record_schema_version(self) -> None:
+        """Record SCHEMA_VERSION as applied."""
+
+    async def migrate(
+        self,
+        report: Callable[[str], None] = print,
+        dry_run: bool = False,
+    ) -> list[str]:
+        """
+        Apply `pending_migrations` in order (reporting progress and timing)
+        and record SCHEMA_VERSION. Returns the names of the applied steps, or
+        of the pending ones when `dry_run` is set.
+        """
+        pending = await self.pending_migrations()
+        for i, (name, apply) in enumerate(pending, 1):
+            label = f"[{i}/{len(pending)}] {name}"
+            if dry_run:
+                report(f"{label}: pending")
+                continue
+            report(f"{label}: applying...")
+            start = time.perf_counter()
+            detail = await apply()
+            elapsed = time.perf_counter() - start
+            report(f"{label}: done in {elapsed:.2f}s" + (f" ({detail})" if detail else ""))
+
+        if not dry_run:
+            await self.record_schema_version()
+        return [name for name, _ in pending]
+
+    async def close(self) -> None:
+        """Release connections/handles on shutdown."""
+        return None
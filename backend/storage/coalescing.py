@@ -0,0 +1,228 @@
+"""
+Write-behind coalescing for high-frequency todo updates (opt-in).
+
+Updates (toggle-complete and `update_todo`) are acknowledged from a
+per-worker buffer and written out once per flush window as one unordered
+bulk write, with repeated writes to the same todo merged. Reads keep
+read-your-writes for the requesting user: `get` overlays buffered fields,
+and list queries flush that user's buffered writes first. If that flush
+fails, buffered fields are overlaid on the listed docs instead (filters and
+ordering then reflect the stored values until the retry succeeds).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime
+
+try:
+    # Test-friendly imports (when importing `backend.storage.coalescing`)
+    from backend.storage.base import TodoFilter, TodoRepository, to_utc_naive
+except ModuleNotFoundError:
+    # Docker/entrypoint-friendly imports (when running from within `/app`)
+    from storage.base import TodoFilter, TodoRepository, to_utc_naive
+
+# Cap on the retry delay after a failed flush.
+_MAX_RETRY_DELAY = 5.0
+
+# A todo returned by a read through this worker is trusted to exist (and be
+# owned by that user) for this long, so `set_fields` can skip its pre-read.
+# A todo deleted elsewhere meanwhile gets a 200 whose write matches nothing.
+_KNOWN_TTL = 60.0
+_MAX_KNOWN = 10000
+
+
+class CoalescingTodoRepository(TodoRepository):
+    """Wraps another TodoRepository, buffering `update` calls."""
+
+    def __init__(self, inner: TodoRepository, window_ms: int = 50, max_batch: int = 500):
+        self._inner = inner
+        self._window = window_ms / 1000
+        self._max_batch = max_batch
+        # (user_id, todo_id) -> merged $set fields, newest value per field.
+        self._pending: dict[tuple[str, str], dict] = {}
+        # Batch currently being written (still visible to reads).
+        self._inflight: dict[tuple[str, str], dict] = {}
+        self._flush_lock = asyncio.Lock()
+        self._timer: asyncio.TimerHandle | None = None
+        self._task: asyncio.Task | None = None
+        self._failures = 0
+        # (user_id, todo_id) -> monotonic time it was last seen by a read.
+        self._known: dict[tuple[str, str], float] = {}
+
+    def _seen(self, user_id: str, doc: dict) -> None:
+        now = time.monotonic()
+        self._known[(user_id, str(doc["_id"]))] = now
+        if len(self._known) > _MAX_KNOWN:
+            cutoff = now - _KNOWN_TTL
+            self._known = {k: t for k, t in self._known.items() if t >= cutoff}
+            if len(self._known) > _MAX_KNOWN:
+                # All recent: forget them (later toggles just read first).
+                self._known.clear()
+
+    def _is_known(self, key: tuple[str, str]) -> bool:
+        seen = self._known.get(key)
+        return seen is not None and time.monotonic() - seen < _KNOWN_TTL
+
+    def _buffered(self, key: tuple[str, str]) -> dict:
+        return {**self._inflight.get(key, {}), **self._pending.get(key, {})}
+
+    def _overlay(self, user_id: str, doc: dict) -> dict:
+        """Apply buffered fields to a doc read from the inner repository."""
+        self._seen(user_id, doc)
+        buffered = self._buffered((user_id, str(doc["_id"])))
+        if buffered:
+            doc.update(buffered)
+            doc["due_date"] = to_utc_naive(doc.get("due_date"))
+        return doc
+
+    def _has_writes_for(self, user_id: str) -> bool:
+        return any(k[0] == user_id for k in self._pending) or any(
+            k[0] == user_id for k in self._inflight
+        )
+
+    def _schedule(self, delay: float | None = None) -> None:
+        if self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self._window if delay is None else delay, self._on_timer)
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._task = asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self, raise_on_error: bool = False) -> None:
+        """
+        Write all buffered updates now (one bulk write). On failure the batch
+        is re-buffered; it is then retried in the background, or the error is
+        raised if `raise_on_error` is set.
+        """
+        async with self._flush_lock:
+            self._cancel_timer()
+            batch, self._pending = self._pending, {}
+            if not batch:
+                return
+            self._inflight = batch
+            try:
+                await self._inner.bulk_update(
+                    [(user_id, todo_id, fields) for (user_id, todo_id), fields in batch.items()]
+                )
+            except BaseException as e:
+                # Put the batch back underneath anything buffered meanwhile.
+                for key, fields in batch.items():
+                    self._pending[key] = {**fields, **self._pending.get(key, {})}
+                if raise_on_error or not isinstance(e, Exception):
+                    raise
+                self._failures += 1
+                delay = min(self._window * 2 ** self._failures, _MAX_RETRY_DELAY)
+                print(f"Warning: coalesced write of {len(batch)} todo(s) failed, retrying in {delay:.2f}s: {e}")
+                self._schedule(delay)
+            else:
+                self._failures = 0
+            finally:
+                self._inflight = {}
+
+    async def drain(self, timeout: float) -> int:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = max(self._window, 0.05)
+        while self._pending:
+            self._cancel_timer()
+            try:
+                await asyncio.wait_for(
+                    self.flush(raise_on_error=True), timeout=max(deadline - loop.time(), 0.001)
+                )
+            except Exception as e:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    print(f"Warning: final flush of buffered todo updates failed: {e!r}")
+                    break
+                await asyncio.sleep(min(delay, remaining))
+                delay = min(delay * 2, _MAX_RETRY_DELAY)
+        self._cancel_timer()
+        return len(self._pending)
+
+    async def list(
+        self,
+        user_id: str,
+        filters: TodoFilter,
+        skip: int,
+        limit: int,
+        sort: str = "created_at",
+        descending: bool = True,
+    ) -> tuple[list[dict], int]:
+        if self._has_writes_for(user_id):
+            await self.flush()
+        items, total = await self._inner.list(
+            user_id, filters, skip=skip, limit=limit, sort=sort, descending=descending
+        )
+        return [self._overlay(user_id, doc) for doc in items], total
+
+    async def list_due(
+        self,
+        user_id: str,
+        due_after: datetime | None,
+        due_before: datetime,
+        limit: int,
+    ) -> list[dict]:
+        if self._has_writes_for(user_id):
+            await self.flush()
+        items = await self._inner.list_due(user_id, due_after, due_before, limit)
+        return [self._overlay(user_id, doc) for doc in items]
+
+    async def insert(self, doc: dict) -> str:
+        todo_id = await self._inner.insert(doc)
+        self._seen(str(doc["user_id"]), {"_id": todo_id})
+        return todo_id
+
+    async def get(self, user_id: str, todo_id: str) -> dict | None:
+        doc = await self._inner.get(user_id, todo_id)
+        return self._overlay(user_id, doc) if doc is not None else None
+
+    async def _buffer(self, user_id: str, todo_id: str, doc: dict, fields: dict) -> dict:
+        key = (user_id, todo_id)
+        self._pending[key] = {**self._pending.get(key, {}), **fields}
+        doc.update(fields)
+        doc["due_date"] = to_utc_naive(doc.get("due_date"))
+        if len(self._pending) >= self._max_batch:
+            await self.flush()
+        else:
+            self._schedule()
+        return doc
+
+    async def update(self, user_id: str, todo_id: str, fields: dict) -> dict | None:
+        doc = await self.get(user_id, todo_id)
+        if doc is None:
+            return None
+        return await self._buffer(user_id, todo_id, doc, fields)
+
+    async def update_doc(self, doc: dict, fields: dict) -> dict | None:
+        # Ownership was checked by the caller's `get`: no re-read. Buffer keys
+        # are string ids like every read's (Mongo docs carry ObjectIds).
+        return await self._buffer(str(doc["user_id"]), str(doc["_id"]), dict(doc), fields)
+
+    async def set_fields(self, user_id: str, todo_id: str, fields: dict) -> bool:
+        key = (user_id, todo_id)
+        if not self._is_known(key):
+            return await self.update(user_id, todo_id, fields) is not None
+        # Seen recently: buffer without a read. `bulk_update` only matches
+        # owned, non-deleted todos, so a stale entry just writes nothing.
+        self._pending[key] = {**self._pending.get(key, {}), **fields}
+        if len(self._pending) >= self._max_batch:
+            await self.flush()
+        else:
+            self._schedule()
+        return True
+
+    async def bulk_update(self, updates: list[tuple[str, str, dict]]) -> None:
+        await self._inner.bulk_update(updates)
+
+    async def soft_delete(self, user_id: str, todo_id: str, deleted_at: datetime) -> bool:
+        # Buffered updates to a deleted todo become no-ops (they match deleted_at None).
+        self._known.pop((user_id, todo_id), None)
+        return await self._inner.soft_delete(user_id, todo_id, deleted_at)
@@ -0,0 +1,268 @@
+"""In-memory storage engine. Data lives for the lifetime of the worker process."""
+
+from __future__ import annotations
+
+import copy
+import re
+from datetime import datetime
+
+try:
+    # Test-friendly imports (when importing `backend.storage.memory`)
+    from backend.storage.base import (
+        SCHEMA_VERSION,
+        SORT_FIELDS,
+        EventRepository,
+        MigrationStep,
+        RevocationRepository,
+        StorageEngine,
+        TodoFilter,
+        TodoRepository,
+        UserRepository,
+        new_id,
+        to_utc_naive,
+    )
+except ModuleNotFoundError:
+    # Docker/entrypoint-friendly imports (when running from within `/app`)
+    from storage.base import (
+        SCHEMA_VERSION,
+        SORT_FIELDS,
+        EventRepository,
+        MigrationStep,
+        RevocationRepository,
+        StorageEngine,
+        TodoFilter,
+        TodoRepository,
+        UserRepository,
+        new_id,
+        to_utc_naive,
+    )
+
+
+def _search_pattern(search: str) -> re.Pattern:
+    """Compile a search term like Mongo's `$regex` + `i`; fall back to a literal match."""
+    try:
+        return re.compile(search, re.IGNORECASE)
+    except re.error:
+        return re.compile(re.escape(search), re.IGNORECASE)
+
+
+class MemoryUserRepository(UserRepository):
+    """Users keyed by id, with lower-cased email/username lookup maps."""
+
+    def __init__(self):
+        self._by_id: dict[str, dict] = {}
+        self._by_email: dict[str, str] = {}
+        self._by_username: dict[str, str] = {}
+
+    async def find_by_email_or_username(self, email: str, username: str) -> dict | None:
+        user_id = self._by_email.get(email.lower()) or self._by_username.get(username.lower())
+        return copy.deepcopy(self._by_id[user_id]) if user_id else None
+
+    async def find_by_email(self, email: str) -> dict | None:
+        user_id = self._by_email.get(email)
+        return copy.deepcopy(self._by_id[user_id]) if user_id else None
+
+    async def insert(self, doc: dict) -> str:
+        email = doc["email"].lower()
+        username = doc["username"].lower()
+        if email in self._by_email or username in self._by_username:
+            raise ValueError("Email or username already exists")
+        user_id = new_id()
+        self._by_id[user_id] = {**copy.deepcopy(doc), "_id": user_id}
+        self._by_email[email] = user_id
+        self._by_username[username] = user_id
+        return user_id
+
+
+class MemoryTodoRepository(TodoRepository):
+    """Todos grouped per owner so listing never scans other users' data."""
+
+    def __init__(self):
+        self._by_user: dict[str, dict[str, dict]] = {}
+
+    def _owned(self, user_id: str, todo_id: str) -> dict | None:
+        doc = self._by_user.get(user_id, {}).get(todo_id)
+        if doc is None or doc.get("deleted_at") is not None:
+            return None
+        return doc
+
+    async def list(
+        self,
+        user_id: str,
+        filters: TodoFilter,
+        skip: int,
+        limit: int,
+        sort: str = "created_at",
+        descending: bool = True,
+    ) -> tuple[list[dict], int]:
+        pattern = _search_pattern(filters.search) if filters.search else None
+        matched = []
+        for doc in self._by_user.get(user_id, {}).values():
+            if doc.get("deleted_at") is not None:
+                continue
+            if filters.completed is not None and doc.get("completed") != filters.completed:
+                continue
+            if filters.priority and doc.get("priority") != filters.priority:
+                continue
+            if filters.category and doc.get("category") != filters.category:
+                continue
+            if pattern and not (
+                pattern.search(doc.get("title") or "")
+                or pattern.search(doc.get("description") or "")
+            ):
+                continue
+            matched.append(doc)
+
+        field = SORT_FIELDS[sort]
+        # Missing values sort lowest (as in MongoDB); ties fall back to id.
+        matched.sort(
+            key=lambda d: (d.get(field) is not None, d.get(field), d["_id"]),
+            reverse=descending,
+        )
+        page = matched[skip:skip + limit]
+        return [copy.deepcopy(d) for d in page], len(matched)
+
+    async def list_due(
+        self,
+        user_id: str,
+        due_after: datetime | None,
+        due_before: datetime,
+        limit: int,
+    ) -> list[dict]:
+        matched = [
+            doc
+            for doc in self._by_user.get(user_id, {}).values()
+            if doc.get("deleted_at") is None
+            and not doc.get("completed")
+            and doc.get("due_date") is not None
+            and doc["due_date"] < due_before
+            and (due_after is None or doc["due_date"] >= due_after)
+        ]
+        matched.sort(key=lambda d: (d["due_date"], d["_id"]))
+        return [copy.deepcopy(d) for d in matched[:limit]]
+
+    async def insert(self, doc: dict) -> str:
+        todo_id = new_id()
+        stored = copy.deepcopy(doc)
+        stored["_id"] = todo_id
+        stored["due_date"] = to_utc_naive(stored.get("due_date"))
+        self._by_user.setdefault(stored["user_id"], {})[todo_id] = stored
+        return todo_id
+
+    async def get(self, user_id: str, todo_id: str) -> dict | None:
+        doc = self._owned(user_id, todo_id)
+        return copy.deepcopy(doc) if doc else None
+
+    async def update(self, user_id: str, todo_id: str, fields: dict) -> dict | None:
+        doc = self._owned(user_id, todo_id)
+        if doc is None:
+            return None
+        doc.update(copy.deepcopy(fields))
+        if "due_date" in fields:
+            doc["due_date"] = to_utc_naive(doc["due_date"])
+        return copy.deepcopy(doc)
+
+    async def soft_delete(self, user_id: str, todo_id: str, deleted_at: datetime) -> bool:
+        doc = self._owned(user_id, todo_id)
+        if doc is None:
+            return False
+        doc["deleted_at"] = deleted_at
+        return True
+
+
+class MemoryRevocationRepository(RevocationRepository):
+    """Revocations keyed by jti (or `user:<id>` for revoke-all)."""
+
+    def __init__(self):
+        self._by_key: dict[str, dict] = {}
+
+    async def revoke(self, jti: str, user_id: str, expires_at: datetime) -> None:
+        self._by_key[jti] = {
+            "jti": jti,
+            "user_id": user_id,
+            "issued_before": None,
+            "revoked_at": datetime.utcnow(),
+            "expires_at": expires_at,
+        }
+
+    async def revoke_all(self, user_id: str, issued_before: datetime, expires_at: datetime) -> None:
+        key = f"user:{user_id}"
+        previous = self._by_key.get(key)
+        if previous is not None:
+            issued_before = max(issued_before, previous["issued_before"])
+            expires_at = max(expires_at, previous["expires_at"])
+        self._by_key[key] = {
+            "jti": None,
+            "user_id": user_id,
+            "issued_before": issued_before,
+            "revoked_at": datetime.utcnow(),
+            "expires_at": expires_at,
+        }
+
+    async def changes_since(self, since: datetime | None) -> list[dict]:
+        now = datetime.utcnow()
+        for key in [k for k, e in self._by_key.items() if e["expires_at"] <= now]:
+            del self._by_key[key]
+        return [
+            dict(e) for e in self._by_key.values() if since is None or e["revoked_at"] >= since
+        ]
+
+
+class MemoryEventRepository(EventRepository):
+    """Events grouped per (owner, todo)."""
+
+    def __init__(self):
+        self._ids: set[str] = set()
+        self._by_todo: dict[tuple[str, str], list[dict]] = {}
+
+    async def insert_many(self, events: list[dict]) -> None:
+        for event in events:
+            if event["_id"] in self._ids:
+                continue
+            self._ids.add(event["_id"])
+            self._by_todo.setdefault((event["user_id"], event["todo_id"]), []).append(
+                copy.deepcopy(event)
+            )
+
+    async def list_for_todo(
+        self,
+        user_id: str,
+        todo_id: str,
+        limit: int,
+        before: datetime | None = None,
+        before_id: str | None = None,
+    ) -> list[dict]:
+        now = datetime.utcnow()
+        matched = [
+            e
+            for e in self._by_todo.get((user_id, todo_id), [])
+            if e["expires_at"] > now
+            and (
+                before is None
+                or e["at"] < before
+                or (before_id is not None and e["at"] == before and e["_id"] < before_id)
+            )
+        ]
+        matched.sort(key=lambda e: (e["at"], e["_id"]), reverse=True)
+        return [copy.deepcopy(e) for e in matched[:limit]]
+
+
+class MemoryStorage(StorageEngine):
+    """Ephemeral engine for development, demos and benchmarks."""
+
+    name = "memory"
+
+    def __init__(self):
+        self.users = MemoryUserRepository()
+        self.todos = MemoryTodoRepository()
+        self.revocations = MemoryRevocationRepository()
+        self.events = MemoryEventRepository()
+
+    async def schema_version(self) -> int:
+        return SCHEMA_VERSION
+
+    async def pending_migrations(self) -> list[MigrationStep]:
+        return []
+
+    async def record_schema_version(self) -> None:
+        return None
@@ -0,0 +1,477 @@
+"""MongoDB storage engine (Motor)."""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+try:
+    # Test-friendly imports (when importing `backend.storage.mongo`)
+    from backend.database import (
+        close_database,
+        ensure_mongo_available,
+        get_database,
+        get_read_preference,
+        get_revoked_tokens_collection,
+        get_todo_events_collection,
+        get_todos_collection,
+        get_users_collection,
+    )
+    from backend.config import settings
+    from backend.storage.base import (
+        NO_DUE_DATE,
+        PRIORITY_RANKS,
+        SCHEMA_VERSION,
+        SORT_FIELDS,
+        EventRepository,
+        MigrationStep,
+        RevocationRepository,
+        StorageEngine,
+        TodoFilter,
+        TodoRepository,
+        UserRepository,
+        is_valid_id,
+    )
+except ModuleNotFoundError:
+    # Docker/entrypoint-friendly imports (when running from within `/app`)
+    from database import (
+        close_database,
+        ensure_mongo_available,
+        get_database,
+        get_read_preference,
+        get_revoked_tokens_collection,
+        get_todo_events_collection,
+        get_todos_collection,
+        get_users_collection,
+    )
+    from config import settings
+    from storage.base import (
+        NO_DUE_DATE,
+        PRIORITY_RANKS,
+        SCHEMA_VERSION,
+        SORT_FIELDS,
+        EventRepository,
+        MigrationStep,
+        RevocationRepository,
+        StorageEngine,
+        TodoFilter,
+        TodoRepository,
+        UserRepository,
+        is_valid_id,
+    )
+
+# Collection holding the applied schema version ({"_id": "schema", "version": N}).
+SCHEMA_META_COLLECTION = "schema_meta"
+
+# Incomplete, non-deleted todos. `$type` is used rather than `deleted_at: None`
+# because partial indexes can't filter on null equality; queries must repeat
+# this exact predicate for the planner to pick the partial index.
+OPEN_TODO_FILTER = {"completed": False, "deleted_at": {"$type": "null"}}
+
+# Desired indexes as (collection, keys, options). Names are explicit (and match
+# the driver defaults for pre-existing indexes) so they can be diffed against
+# `index_information()`.
+INDEXES: list[tuple[str, list[tuple[str, int]], dict]] = [
+    ("users", [("email", 1)], {"name": "email_1", "unique": True}),
+    ("users", [("username", 1)], {"name": "username_1", "unique": True}),
+    ("todos", [("user_id", 1)], {"name": "user_id_1"}),
+    ("todos", [("created_at", 1)], {"name": "created_at_1"}),
+    ("todos", [("deleted_at", 1)], {"name": "deleted_at_1"}),
+    # One per list sort: equality on (user_id, deleted_at) then the sort key,
+    # so each `sort=` is an index walk (either direction) instead of an
+    # in-memory sort.
+    *(
+        (
+            "todos",
+            [("user_id", 1), ("deleted_at", 1), (field, 1), ("_id", 1)],
+            {"name": f"user_id_1_deleted_at_1_{field}_1__id_1"},
+        )
+        for field in SORT_FIELDS.values()
+    ),
+    # Upcoming/overdue views: only open todos are indexed, so the index stays
+    # small and a due-date window is a short range scan.
+    (
+        "todos",
+        [("user_id", 1), ("due_date", 1)],
+        {"name": "user_id_1_due_date_1_open", "partialFilterExpression": OPEN_TODO_FILTER},
+    ),
+    # Session revocations: workers poll by `revoked_at`; entries are removed
+    # by the TTL monitor once the revoked tokens would have expired anyway.
+    ("revoked_tokens", [("revoked_at", 1)], {"name": "revoked_at_1"}),
+    ("revoked_tokens", [("expires_at", 1)], {"name": "expires_at_1", "expireAfterSeconds": 0}),
+    # Todo history: newest-first per owned todo; TTL on each event's expiry.
+    (
+        "todo_events",
+        [("user_id", 1), ("todo_id", 1), ("at", 1), ("_id", 1)],
+        {"name": "user_id_1_todo_id_1_at_1__id_1"},
+    ),
+    ("todo_events", [("expires_at", 1)], {"name": "expires_at_1", "expireAfterSeconds": 0}),
+]
+
+# (collection, index name) superseded by the ones above; dropped by `migrate` when present.
+OBSOLETE_INDEXES = [
+    ("todos", "user_id_1_deleted_at_1_due_date_1__id_1"),
+]
+
+
+async def _backfill_due_sort(db) -> str:
+    result = await db["todos"].update_many(
+        {"due_sort": {"$exists": False}},
+        [{"$set": {"due_sort": {"$ifNull": ["$due_date", NO_DUE_DATE]}}}],
+    )
+    return f"{result.modified_count} todo(s) updated"
+
+
+async def _backfill_priority_rank(db) -> str:
+    # Same normalization as `priority_rank()` (strip + lower) and the SQLite step.
+    result = await db["todos"].update_many(
+        {"priority_rank": {"$exists": False}},
+        [{
+            "$set": {
+                "priority_rank": {
+                    "$switch": {
+                        "branches": [
+                            {
+                                "case": {"$eq": [{"$toLower": {"$trim": {"input": "$priority"}}}, name]},
+                                "then": rank,
+                            }
+                            for name, rank in PRIORITY_RANKS.items()
+                        ],
+                        "default": 0,
+                    }
+                }
+            }
+        }],
+    )
+    return f"{result.modified_count} todo(s) updated"
+
+
+# Versioned data steps as (version, name, step). A step runs when the recorded
+# schema version is below its version; steps must be idempotent.
+DATA_MIGRATIONS: list[tuple[int, str, Callable[..., Awaitable[str]]]] = [
+    (2, "todos.priority_rank backfill", _backfill_priority_rank),
+    (6, "todos.due_sort backfill", _backfill_due_sort),
+]
+
+
+class MongoUserRepository(UserRepository):
+    """Users stored in the `users` collection."""
+
+    def __init__(self, collection):
+        self._coll = collection
+
+    async def find_by_email_or_username(self, email: str, username: str) -> dict | None:
+        return await self._coll.find_one(
+            {
+                "$or": [
+                    {"email": {"$regex": f"^{email}$", "$options": "i"}},
+                    {"username": {"$regex": f"^{username}$", "$options": "i"}},
+                ]
+            },
+            max_time_ms=4000,
+        )
+
+    async def find_by_email(self, email: str) -> dict | None:
+        return await self._coll.find_one({"email": email}, max_time_ms=4000)
+
+    async def insert(self, doc: dict) -> str:
+        result = await self._coll.insert_one(dict(doc))
+        return str(result.inserted_id)
+
+
+class MongoTodoRepository(TodoRepository):
+    """
+    Todos stored in the `todos` collection. `list`/`list_due` read through
+    `_read_coll` (the configured read preference, e.g. secondaryPreferred),
+    except for users who wrote through this worker within
+    `read_your_writes_seconds` (per-worker, best effort); everything else
+    uses the primary.
+    """
+
+    def __init__(self, collection, read_preference=None, read_your_writes_seconds: float = 0.0):
+        self._coll = collection
+        # Only reads routed away from the primary need write tracking.
+        self._routed = read_preference is not None
+        self._read_coll = (
+            collection.with_options(read_preference=read_preference)
+            if self._routed
+            else collection
+        )
+        self._read_your_writes = read_your_writes_seconds
+        # user_id -> time of their last write in this worker.
+        self._last_write: dict[str, float] = {}
+
+    def _wrote(self, user_id: str) -> None:
+        if not self._routed:
+            return
+        now = time.monotonic()
+        # Callers may pass an ObjectId (from a fetched doc); key by string.
+        self._last_write[str(user_id)] = now
+        if len(self._last_write) > 10000:
+            cutoff = now - self._read_your_writes
+            self._last_write = {u: t for u, t in self._last_write.items() if t >= cutoff}
+
+    def _reader(self, user_id: str):
+        """Collection handle for read-only queries by `user_id`."""
+        last = self._last_write.get(str(user_id))
+        if last is not None and time.monotonic() - last < self._read_your_writes:
+            return self._coll
+        return self._read_coll
+
+    @staticmethod
+    def _owned(user_id: str, todo_id: str) -> dict | None:
+        """Filter for a non-deleted todo owned by `user_id`; None if the id is malformed."""
+        if not is_valid_id(todo_id):
+            return None
+        return {"_id": ObjectId(todo_id), "user_id": ObjectId(user_id), "deleted_at": None}
+
+    async def list(
+        self,
+        user_id: str,
+        filters: TodoFilter,
+        skip: int,
+        limit: int,
+        sort: str = "created_at",
+        descending: bool = True,
+    ) -> tuple[list[dict], int]:
+        query: dict = {"user_id": ObjectId(user_id), "deleted_at": None}
+        if filters.completed is not None:
+            query["completed"] = filters.completed
+        if filters.priority:
+            query["priority"] = filters.priority
+        if filters.category:
+            query["category"] = filters.category
+        if filters.search:
+            query["$or"] = [
+                {"title": {"$regex": filters.search, "$options": "i"}},
+                {"description": {"$regex": filters.search, "$options": "i"}},
+            ]
+
+        direction = -1 if descending else 1
+        reader = self._reader(user_id)
+        cursor = (
+            reader.find(query)
+            .sort([(SORT_FIELDS[sort], direction), ("_id", direction)])
+            .skip(skip)
+            .limit(limit)
+        )
+        total = await reader.count_documents(query)
+        items = [x async for x in cursor]
+        return items, total
+
+    async def list_due(
+        self,
+        user_id: str,
+        due_after: datetime | None,
+        due_before: datetime,
+        limit: int,
+    ) -> list[dict]:
+        due: dict = {"$lt": due_before}
+        if due_after is not None:
+            due["$gte"] = due_after
+        cursor = (
+            self._reader(user_id)
+            .find({"user_id": ObjectId(user_id), "due_date": due, **OPEN_TODO_FILTER})
+            .sort([("due_date", 1), ("_id", 1)])
+            .limit(limit)
+        )
+        return [x async for x in cursor]
+
+    async def insert(self, doc: dict) -> str:
+        stored = dict(doc)
+        stored["user_id"] = ObjectId(stored["user_id"])
+        self._wrote(doc["user_id"])
+        result = await self._coll.insert_one(stored)
+        return str(result.inserted_id)
+
+    async def get(self, user_id: str, todo_id: str) -> dict | None:
+        query = self._owned(user_id, todo_id)
+        if query is None:
+            return None
+        return await self._coll.find_one(query)
+
+    async def update(self, user_id: str, todo_id: str, fields: dict) -> dict | None:
+        query = self._owned(user_id, todo_id)
+        if query is None:
+            return None
+        self._wrote(user_id)
+        return await self._coll.find_one_and_update(
+            query,
+            {"$set": fields},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def bulk_update(self, updates: list[tuple[str, str, dict]]) -> None:
+        requests = [
+            UpdateOne(query, {"$set": fields})
+            for user_id, todo_id, fields in updates
+            if (query := self._owned(user_id, todo_id)) is not None
+        ]
+        if requests:
+            for user_id in {user_id for user_id, _, _ in updates}:
+                self._wrote(user_id)
+            await self._coll.bulk_write(requests, ordered=False)
+
+    async def soft_delete(self, user_id: str, todo_id: str, deleted_at: datetime) -> bool:
+        query = self._owned(user_id, todo_id)
+        if query is None:
+            return False
+        self._wrote(user_id)
+        result = await self._coll.update_one(query, {"$set": {"deleted_at": deleted_at}})
+        return result.matched_count > 0
+
+
+class MongoRevocationRepository(RevocationRepository):
+    """
+    Revocations in the `revoked_tokens` collection, keyed by jti (or
+    `user:<id>` for revoke-all). `revoked_at` comes from the server clock so
+    every worker polls against the same timeline.
+    """
+
+    _FIELDS = {"_id": 0, "jti": 1, "user_id": 1, "issued_before": 1, "revoked_at": 1, "expires_at": 1}
+
+    def __init__(self, collection):
+        self._coll = collection
+
+    async def revoke(self, jti: str, user_id: str, expires_at: datetime) -> None:
+        await self._coll.update_one(
+            {"_id": jti},
+            {
+                "$set": {"jti": jti, "user_id": user_id, "issued_before": None, "expires_at": expires_at},
+                "$currentDate": {"revoked_at": True},
+            },
+            upsert=True,
+        )
+
+    async def revoke_all(self, user_id: str, issued_before: datetime, expires_at: datetime) -> None:
+        await self._coll.update_one(
+            {"_id": f"user:{user_id}"},
+            {
+                "$set": {"jti": None, "user_id": user_id},
+                "$max": {"issued_before": issued_before, "expires_at": expires_at},
+                "$currentDate": {"revoked_at": True},
+            },
+            upsert=True,
+        )
+
+    async def changes_since(self, since: datetime | None) -> list[dict]:
+        query: dict = {"expires_at": {"$gt": datetime.utcnow()}}
+        if since is not None:
+            query["revoked_at"] = {"$gte": since}
+        return await self._coll.find(query, self._FIELDS).to_list(length=None)
+
+
+class MongoEventRepository(EventRepository):
+    """Events in the `todo_events` collection."""
+
+    def __init__(self, collection):
+        self._coll = collection
+
+    async def insert_many(self, events: list[dict]) -> None:
+        try:
+            await self._coll.insert_many(
+                [{**e, "_id": ObjectId(e["_id"])} for e in events], ordered=False
+            )
+        except BulkWriteError as e:
+            # A retried batch may have partly landed already; duplicates are fine.
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+            if e.details.get("writeConcernErrors"):
+                raise
+
+    async def list_for_todo(
+        self,
+        user_id: str,
+        todo_id: str,
+        limit: int,
+        before: datetime | None = None,
+        before_id: str | None = None,
+    ) -> list[dict]:
+        query: dict = {"user_id": user_id, "todo_id": todo_id, "expires_at": {"$gt": datetime.utcnow()}}
+        if before is not None and before_id is not None:
+            query["$or"] = [
+                {"at": {"$lt": before}},
+                {"at": before, "_id": {"$lt": ObjectId(before_id)}},
+            ]
+        elif before is not None:
+            query["at"] = {"$lt": before}
+        cursor = self._coll.find(query).sort([("at", -1), ("_id", -1)]).limit(limit)
+        return [{**e, "_id": str(e["_id"])} async for e in cursor]
+
+
+class MongoStorage(StorageEngine):
+    """Default engine backed by the shared Motor client in `database.py`."""
+
+    name = "mongo"
+
+    def __init__(self, db):
+        self._db = db
+        self.users = MongoUserRepository(get_users_collection(db))
+        self.todos = MongoTodoRepository(
+            get_todos_collection(db),
+            read_preference=get_read_preference(),
+            read_your_writes_seconds=settings.mongo_read_your_writes_seconds,
+        )
+        self.revocations = MongoRevocationRepository(get_revoked_tokens_collection(db))
+        self.events = MongoEventRepository(get_todo_events_collection(db))
+
+    @classmethod
+    async def create(cls) -> "MongoStorage":
+        return cls(await get_database())
+
+    async def ensure_available(self) -> None:
+        await ensure_mongo_available(use_cache=False)
+
+    async def schema_version(self) -> int:
+        doc = await self._db[SCHEMA_META_COLLECTION].find_one({"_id": "schema"})
+        return int(doc["version"]) if doc else 0
+
+    async def _create_index(self, coll_name: str, keys: list, options: dict) -> None:
+        await self._db[coll_name].create_index(keys, **options)
+
+    async def pending_migrations(self) -> list[MigrationStep]:
+        recorded = await self.schema_version()
+        pending: list[MigrationStep] = [
+            (name, lambda step=step: step(self._db))
+            for version, name, step in DATA_MIGRATIONS
+            if version > recorded
+        ]
+
+        existing: dict[str, set[str]] = {}
+        for coll_name, keys, options in INDEXES:
+            if coll_name not in existing:
+                existing[coll_name] = set(await self._db[coll_name].index_information())
+            if options["name"] not in existing[coll_name]:
+                pending.append((
+                    f"{coll_name}.{options['name']}",
+                    lambda coll_name=coll_name, keys=keys, options=options: (
+                        self._create_index(coll_name, keys, options)
+                    ),
+                ))
+        for coll_name, index_name in OBSOLETE_INDEXES:
+            if coll_name not in existing:
+                existing[coll_name] = set(await self._db[coll_name].index_information())
+            if index_name in existing[coll_name]:
+                pending.append((
+                    f"drop {coll_name}.{index_name}",
+                    lambda coll_name=coll_name, index_name=index_name: (
+                        self._db[coll_name].drop_index(index_name)
+                    ),
+                ))
+
+        return pending
+
+    async def record_schema_version(self) -> None:
+        await self._db[SCHEMA_META_COLLECTION].update_one(
+            {"_id": "schema"},
+            {"$set": {"version": SCHEMA_VERSION, "applied_at": datetime.utcnow()}},
+            upsert=True,
+        )
+
+    async def close(self) -> None:
+        close_database()
@@ -0,0 +1,634 @@
+"""Embedded SQLite storage engine for single-node deployments."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable
+
+try:
+    # Test-friendly imports (when importing `backend.storage.sqlite`)
+    from backend.storage.base import (
+        NO_DUE_DATE,
+        PRIORITY_RANKS,
+        SCHEMA_VERSION,
+        SORT_FIELDS,
+        EventRepository,
+        MigrationStep,
+        RevocationRepository,
+        StorageEngine,
+        TodoFilter,
+        TodoRepository,
+        UserRepository,
+        new_id,
+        to_utc_naive,
+    )
+except ModuleNotFoundError:
+    # Docker/entrypoint-friendly imports (when running from within `/app`)
+    from storage.base import (
+        NO_DUE_DATE,
+        PRIORITY_RANKS,
+        SCHEMA_VERSION,
+        SORT_FIELDS,
+        EventRepository,
+        MigrationStep,
+        RevocationRepository,
+        StorageEngine,
+        TodoFilter,
+        TodoRepository,
+        UserRepository,
+        new_id,
+        to_utc_naive,
+    )
+
+# Datetimes are stored as fixed-width UTC strings so lexical order == time order.
+_DT_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    email TEXT NOT NULL,
+    password TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS todos (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    completed INTEGER NOT NULL DEFAULT 0,
+    priority TEXT NOT NULL DEFAULT 'medium',
+    priority_rank INTEGER,
+    category TEXT NOT NULL DEFAULT 'Uncategorized',
+    due_date TEXT,
+    due_sort TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    subtasks TEXT NOT NULL DEFAULT '[]',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    deleted_at TEXT
+);
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    id TEXT PRIMARY KEY,
+    jti TEXT,
+    user_id TEXT NOT NULL,
+    issued_before TEXT,
+    revoked_at TEXT NOT NULL,
+    expires_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS todo_events (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    todo_id TEXT NOT NULL,
+    action TEXT NOT NULL,
+    changes TEXT NOT NULL,
+    previous TEXT,
+    at TEXT NOT NULL,
+    expires_at TEXT NOT NULL
+);
+"""
+
+# Desired indexes by name; diffed against sqlite_master by `migrate`.
+_INDEXES = {
+    "idx_users_email": "CREATE UNIQUE INDEX idx_users_email ON users(lower(email))",
+    "idx_users_username": "CREATE UNIQUE INDEX idx_users_username ON users(lower(username))",
+    # One per list sort. Ties are broken by rowid, which every index carries,
+    # so both directions are a plain index walk.
+    **{
+        f"idx_todos_user_{column}": (
+            f"CREATE INDEX idx_todos_user_{column} "
+            f"ON todos(user_id, {column}) WHERE deleted_at IS NULL"
+        )
+        for column in SORT_FIELDS.values()
+    },
+    # Upcoming/overdue views over open todos only.
+    "idx_todos_user_due_open": (
+        "CREATE INDEX idx_todos_user_due_open "
+        "ON todos(user_id, due_date) WHERE deleted_at IS NULL AND completed = 0"
+    ),
+    # Session revocations: polled by `revoked_at`, pruned by `expires_at`.
+    "idx_revoked_tokens_revoked_at": (
+        "CREATE INDEX idx_revoked_tokens_revoked_at ON revoked_tokens(revoked_at)"
+    ),
+    "idx_revoked_tokens_expires_at": (
+        "CREATE INDEX idx_revoked_tokens_expires_at ON revoked_tokens(expires_at)"
+    ),
+    # Todo history, newest first per owned todo; pruned by `expires_at`.
+    "idx_todo_events_user_todo_at": (
+        "CREATE INDEX idx_todo_events_user_todo_at ON todo_events(user_id, todo_id, at)"
+    ),
+    "idx_todo_events_expires_at": (
+        "CREATE INDEX idx_todo_events_expires_at ON todo_events(expires_at)"
+    ),
+}
+
+# Indexes superseded by the ones above; dropped by `migrate` when present.
+_OBSOLETE_INDEXES = ("idx_todos_user_created", "idx_todos_user_due_date")
+
+
+def _add_priority_rank(c: sqlite3.Connection) -> str:
+    columns = {row[1] for row in c.execute("PRAGMA table_info(todos)")}
+    if "priority_rank" not in columns:
+        c.execute("ALTER TABLE todos ADD COLUMN priority_rank INTEGER")
+    cases = " ".join(f"WHEN '{name}' THEN {rank}" for name, rank in PRIORITY_RANKS.items())
+    cur = c.execute(
+        f"UPDATE todos SET priority_rank = CASE lower(trim(priority)) {cases} ELSE 0 END "
+        "WHERE priority_rank IS NULL"
+    )
+    return f"{cur.rowcount} todo(s) updated"
+
+
+def _add_due_sort(c: sqlite3.Connection) -> str:
+    columns = {row[1] for row in c.execute("PRAGMA table_info(todos)")}
+    if "due_sort" not in columns:
+        c.execute("ALTER TABLE todos ADD COLUMN due_sort TEXT")
+    cur = c.execute(
+        "UPDATE todos SET due_sort = coalesce(due_date, ?) WHERE due_sort IS NULL",
+        (_dt_out(NO_DUE_DATE),),
+    )
+    return f"{cur.rowcount} todo(s) updated"
+
+
+def _index_step(sql: str) -> Callable[[sqlite3.Connection], None]:
+    def _apply(c: sqlite3.Connection) -> None:
+        c.execute(sql)
+    return _apply
+
+
+# Versioned data steps as (version, name, step); see storage/mongo.py.
+_DATA_MIGRATIONS = [
+    (2, "todos.priority_rank backfill", _add_priority_rank),
+    (6, "todos.due_sort backfill", _add_due_sort),
+]
+
+_TODO_COLUMNS = (
+    "user_id", "title", "description", "completed", "priority", "priority_rank", "category",
+    "due_date", "due_sort", "status", "subtasks", "created_at", "updated_at", "deleted_at",
+)
+
+
+@lru_cache(maxsize=256)
+def _compile(pattern: str) -> re.Pattern:
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error:
+        return re.compile(re.escape(pattern), re.IGNORECASE)
+
+
+def _regexp(pattern: str, value: str | None) -> bool:
+    """SQLite REGEXP implementation matching Mongo's case-insensitive `$regex`."""
+    return value is not None and _compile(pattern).search(value) is not None
+
+
+def _dt_out(value: datetime | None) -> str | None:
+    value = to_utc_naive(value)
+    return value.strftime(_DT_FORMAT) if value else None
+
+
+def _dt_in(value: str | None) -> datetime | None:
+    return datetime.strptime(value, _DT_FORMAT) if value else None
+
+
+def _encode(column: str, value):
+    """Python value -> SQLite column value."""
+    if column == "completed":
+        return int(bool(value))
+    if column == "subtasks":
+        return json.dumps(value or [])
+    if isinstance(value, datetime):
+        return _dt_out(value)
+    return value
+
+
+def _user_from_row(row: sqlite3.Row | None) -> dict | None:
+    if row is None:
+        return None
+    return {
+        "_id": row["id"],
+        "username": row["username"],
+        "email": row["email"],
+        "password": row["password"],
+        "created_at": _dt_in(row["created_at"]),
+        "updated_at": _dt_in(row["updated_at"]),
+    }
+
+
+def _todo_from_row(row: sqlite3.Row | None) -> dict | None:
+    if row is None:
+        return None
+    return {
+        "_id": row["id"],
+        "user_id": row["user_id"],
+        "title": row["title"],
+        "description": row["description"],
+        "completed": bool(row["completed"]),
+        "priority": row["priority"],
+        "priority_rank": row["priority_rank"],
+        "category": row["category"],
+        "due_date": _dt_in(row["due_date"]),
+        "due_sort": _dt_in(row["due_sort"]),
+        "status": row["status"],
+        "subtasks": json.loads(row["subtasks"]),
+        "created_at": _dt_in(row["created_at"]),
+        "updated_at": _dt_in(row["updated_at"]),
+        "deleted_at": _dt_in(row["deleted_at"]),
+    }
+
+
+class _Connection:
+    """
+    One SQLite connection per worker, serialized by a lock and driven from
+    the default thread pool so queries never block the event loop.
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.create_function("REGEXP", 2, _regexp, deterministic=True)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def _call(self, fn, *args):
+        with self._lock:
+            return fn(self._conn, *args)
+
+    async def run(self, fn, *args):
+        return await asyncio.to_thread(self._call, fn, *args)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SQLiteUserRepository(UserRepository):
+    """Users stored in the `users` table."""
+
+    def __init__(self, conn: _Connection):
+        self._conn = conn
+
+    async def find_by_email_or_username(self, email: str, username: str) -> dict | None:
+        def _query(c: sqlite3.Connection):
+            return c.execute(
+                "SELECT * FROM users WHERE lower(email) = ? "
+                "UNION SELECT * FROM users WHERE lower(username) = ? LIMIT 1",
+                (email.lower(), username.lower()),
+            ).fetchone()
+        return _user_from_row(await self._conn.run(_query))
+
+    async def find_by_email(self, email: str) -> dict | None:
+        def _query(c: sqlite3.Connection):
+            return c.execute(
+                "SELECT * FROM users WHERE lower(email) = ?", (email.lower(),)
+            ).fetchone()
+        return _user_from_row(await self._conn.run(_query))
+
+    async def insert(self, doc: dict) -> str:
+        user_id = new_id()
+
+        def _insert(c: sqlite3.Connection):
+            c.execute(
+                "INSERT INTO users (id, username, email, password, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    user_id,
+                    doc["username"],
+                    doc["email"],
+                    doc["password"],
+                    _dt_out(doc["created_at"]),
+                    _dt_out(doc["updated_at"]),
+                ),
+            )
+        await self._conn.run(_insert)
+        return user_id
+
+
+class SQLiteTodoRepository(TodoRepository):
+    """Todos stored in the `todos` table."""
+
+    def __init__(self, conn: _Connection):
+        self._conn = conn
+
+    async def list(
+        self,
+        user_id: str,
+        filters: TodoFilter,
+        skip: int,
+        limit: int,
+        sort: str = "created_at",
+        descending: bool = True,
+    ) -> tuple[list[dict], int]:
+        where = ["user_id = ?", "deleted_at IS NULL"]
+        params: list = [user_id]
+        if filters.completed is not None:
+            where.append("completed = ?")
+            params.append(int(filters.completed))
+        if filters.priority:
+            where.append("priority = ?")
+            params.append(filters.priority)
+        if filters.category:
+            where.append("category = ?")
+            params.append(filters.category)
+        if filters.search:
+            where.append("(title REGEXP ? OR description REGEXP ?)")
+            params.extend([filters.search, filters.search])
+        clause = " AND ".join(where)
+        direction = "DESC" if descending else "ASC"
+        order_by = f"{SORT_FIELDS[sort]} {direction}, rowid {direction}"
+
+        def _query(c: sqlite3.Connection):
+            total = c.execute(f"SELECT COUNT(*) FROM todos WHERE {clause}", params).fetchone()[0]
+            rows = c.execute(
+                f"SELECT * FROM todos WHERE {clause} ORDER BY {order_by} LIMIT ? OFFSET ?",
+                [*params, limit, skip],
+            ).fetchall()
+            return rows, total
+
+        rows, total = await self._conn.run(_query)
+        return [_todo_from_row(r) for r in rows], total
+
+    async def list_due(
+        self,
+        user_id: str,
+        due_after: datetime | None,
+        due_before: datetime,
+        limit: int,
+    ) -> list[dict]:
+        # The predicate must match idx_todos_user_due_open's WHERE clause.
+        where = "user_id = ? AND deleted_at IS NULL AND completed = 0 AND due_date < ?"
+        params: list = [user_id, _dt_out(due_before)]
+        if due_after is not None:
+            where += " AND due_date >= ?"
+            params.append(_dt_out(due_after))
+
+        def _query(c: sqlite3.Connection):
+            return c.execute(
+                f"SELECT * FROM todos WHERE {where} ORDER BY due_date, rowid LIMIT ?",
+                [*params, limit],
+            ).fetchall()
+        return [_todo_from_row(r) for r in await self._conn.run(_query)]
+
+    async def insert(self, doc: dict) -> str:
+        todo_id = new_id()
+        values = [todo_id, *(_encode(col, doc.get(col)) for col in _TODO_COLUMNS)]
+        placeholders = ", ".join("?" for _ in values)
+
+        def _insert(c: sqlite3.Connection):
+            c.execute(
+                f"INSERT INTO todos (id, {', '.join(_TODO_COLUMNS)}) VALUES ({placeholders})",
+                values,
+            )
+        await self._conn.run(_insert)
+        return todo_id
+
+    async def get(self, user_id: str, todo_id: str) -> dict | None:
+        def _query(c: sqlite3.Connection):
+            return c.execute(
+                "SELECT * FROM todos WHERE id = ? AND user_id = ? AND deleted_at IS NULL",
+                (todo_id, user_id),
+            ).fetchone()
+        return _todo_from_row(await self._conn.run(_query))
+
+    async def update(self, user_id: str, todo_id: str, fields: dict) -> dict | None:
+        columns = [col for col in fields if col in _TODO_COLUMNS]
+        assignments = ", ".join(f"{col} = ?" for col in columns)
+        values = [_encode(col, fields[col]) for col in columns]
+
+        def _update(c: sqlite3.Connection):
+            if columns:
+                cur = c.execute(
+                    f"UPDATE todos SET {assignments} "
+                    "WHERE id = ? AND user_id = ? AND deleted_at IS NULL",
+                    [*values, todo_id, user_id],
+                )
+                if cur.rowcount == 0:
+                    return None
+            return c.execute(
+                "SELECT * FROM todos WHERE id = ? AND user_id = ? AND deleted_at IS NULL",
+                (todo_id, user_id),
+            ).fetchone()
+        return _todo_from_row(await self._conn.run(_update))
+
+    async def bulk_update(self, updates: list[tuple[str, str, dict]]) -> None:
+        def _update(c: sqlite3.Connection) -> None:
+            c.execute("BEGIN")
+            try:
+                for user_id, todo_id, fields in updates:
+                    columns = [col for col in fields if col in _TODO_COLUMNS]
+                    if not columns:
+                        continue
+                    c.execute(
+                        f"UPDATE todos SET {', '.join(f'{col} = ?' for col in columns)} "
+                        "WHERE id = ? AND user_id = ? AND deleted_at IS NULL",
+                        [*(_encode(col, fields[col]) for col in columns), todo_id, user_id],
+                    )
+                c.execute("COMMIT")
+            except Exception:
+                c.execute("ROLLBACK")
+                raise
+        await self._conn.run(_update)
+
+    async def soft_delete(self, user_id: str, todo_id: str, deleted_at: datetime) -> bool:
+        def _delete(c: sqlite3.Connection):
+            return c.execute(
+                "UPDATE todos SET deleted_at = ? "
+                "WHERE id = ? AND user_id = ? AND deleted_at IS NULL",
+                (_dt_out(deleted_at), todo_id, user_id),
+            ).rowcount
+        return await self._conn.run(_delete) > 0
+
+
+def _revocation_from_row(row: sqlite3.Row) -> dict:
+    return {
+        "jti": row["jti"],
+        "user_id": row["user_id"],
+        "issued_before": _dt_in(row["issued_before"]),
+        "revoked_at": _dt_in(row["revoked_at"]),
+        "expires_at": _dt_in(row["expires_at"]),
+    }
+
+
+class SQLiteRevocationRepository(RevocationRepository):
+    """
+    Revocations in the `revoked_tokens` table, keyed by jti (or `user:<id>`
+    for revoke-all). Expired rows are pruned on write (no TTL in SQLite).
+    """
+
+    def __init__(self, conn: _Connection):
+        self._conn = conn
+
+    async def _upsert(
+        self,
+        key: str,
+        jti: str | None,
+        user_id: str,
+        issued_before: datetime | None,
+        expires_at: datetime,
+    ) -> None:
+        now = datetime.utcnow()
+
+        def _write(c: sqlite3.Connection) -> None:
+            c.execute("DELETE FROM revoked_tokens WHERE expires_at <= ?", (_dt_out(now),))
+            c.execute(
+                "INSERT INTO revoked_tokens (id, jti, user_id, issued_before, revoked_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET "
+                "issued_before = max(issued_before, excluded.issued_before), "
+                "revoked_at = excluded.revoked_at, "
+                "expires_at = max(expires_at, excluded.expires_at)",
+                (key, jti, user_id, _dt_out(issued_before), _dt_out(now), _dt_out(expires_at)),
+            )
+        await self._conn.run(_write)
+
+    async def revoke(self, jti: str, user_id: str, expires_at: datetime) -> None:
+        await self._upsert(jti, jti, user_id, None, expires_at)
+
+    async def revoke_all(self, user_id: str, issued_before: datetime, expires_at: datetime) -> None:
+        await self._upsert(f"user:{user_id}", None, user_id, issued_before, expires_at)
+
+    async def changes_since(self, since: datetime | None) -> list[dict]:
+        now = _dt_out(datetime.utcnow())
+
+        def _query(c: sqlite3.Connection):
+            if since is None:
+                return c.execute(
+                    "SELECT * FROM revoked_tokens WHERE expires_at > ?", (now,)
+                ).fetchall()
+            return c.execute(
+                "SELECT * FROM revoked_tokens WHERE revoked_at >= ? AND expires_at > ?",
+                (_dt_out(since), now),
+            ).fetchall()
+        return [_revocation_from_row(row) for row in await self._conn.run(_query)]
+
+
+def _json_value(value):
+    """`json.dumps` default: datetimes in changes/previous as ISO 8601 strings."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _event_from_row(row: sqlite3.Row) -> dict:
+    return {
+        "_id": row["id"],
+        "user_id": row["user_id"],
+        "todo_id": row["todo_id"],
+        "action": row["action"],
+        "changes": json.loads(row["changes"]),
+        "previous": json.loads(row["previous"]) if row["previous"] is not None else None,
+        "at": _dt_in(row["at"]),
+        "expires_at": _dt_in(row["expires_at"]),
+    }
+
+
+class SQLiteEventRepository(EventRepository):
+    """Events in the `todo_events` table. Expired rows are pruned on write."""
+
+    def __init__(self, conn: _Connection):
+        self._conn = conn
+
+    async def insert_many(self, events: list[dict]) -> None:
+        rows = [
+            (
+                e["_id"],
+                e["user_id"],
+                e["todo_id"],
+                e["action"],
+                json.dumps(e["changes"], default=_json_value),
+                json.dumps(e["previous"], default=_json_value) if e.get("previous") is not None else None,
+                _dt_out(e["at"]),
+                _dt_out(e["expires_at"]),
+            )
+            for e in events
+        ]
+        now = _dt_out(datetime.utcnow())
+
+        def _insert(c: sqlite3.Connection) -> None:
+            c.execute("BEGIN")
+            try:
+                c.execute("DELETE FROM todo_events WHERE expires_at <= ?", (now,))
+                c.executemany(
+                    "INSERT OR IGNORE INTO todo_events "
+                    "(id, user_id, todo_id, action, changes, previous, at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                c.execute("COMMIT")
+            except Exception:
+                c.execute("ROLLBACK")
+                raise
+        await self._conn.run(_insert)
+
+    async def list_for_todo(
+        self,
+        user_id: str,
+        todo_id: str,
+        limit: int,
+        before: datetime | None = None,
+        before_id: str | None = None,
+    ) -> list[dict]:
+        sql = "SELECT * FROM todo_events WHERE user_id = ? AND todo_id = ? AND expires_at > ?"
+        params: list = [user_id, todo_id, _dt_out(datetime.utcnow())]
+        if before is not None and before_id is not None:
+            sql += " AND (at < ? OR (at = ? AND id < ?))"
+            params.extend([_dt_out(before), _dt_out(before), before_id])
+        elif before is not None:
+            sql += " AND at < ?"
+            params.append(_dt_out(before))
+        sql += " ORDER BY at DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        def _query(c: sqlite3.Connection):
+            return c.execute(sql, params).fetchall()
+        return [_event_from_row(row) for row in await self._conn.run(_query)]
+
+
+class SQLiteStorage(StorageEngine):
+    """Single-file engine (WAL mode) for self-hosted instances without MongoDB."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self._conn = _Connection(path)
+        self.users = SQLiteUserRepository(self._conn)
+        self.todos = SQLiteTodoRepository(self._conn)
+        self.revocations = SQLiteRevocationRepository(self._conn)
+        self.events = SQLiteEventRepository(self._conn)
+
+    async def schema_version(self) -> int:
+        return await self._conn.run(lambda c: c.execute("PRAGMA user_version").fetchone()[0])
+
+    async def pending_migrations(self) -> list[MigrationStep]:
+        recorded = await self.schema_version()
+        steps: list[tuple[str, Callable[[sqlite3.Connection], str | None]]] = [
+            (name, step) for version, name, step in _DATA_MIGRATIONS if version > recorded
+        ]
+        existing = await self._conn.run(
+            lambda c: {r[0] for r in c.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        )
+        steps.extend(
+            (name, _index_step(sql)) for name, sql in _INDEXES.items() if name not in existing
+        )
+        steps.extend(
+            (f"drop {name}", _index_step(f"DROP INDEX {name}"))
+            for name in _OBSOLETE_INDEXES
+            if name in existing
+        )
+
+        return [(name, lambda step=step: self._conn.run(step)) for name, step in steps]
+
+    async def record_schema_version(self) -> None:
+        # PRAGMA doesn't take bound parameters; SCHEMA_VERSION is an int constant.
+        await self._conn.run(lambda c: c.execute(f"PRAGMA user_version = {int(SCHEMA_VERSION)}"))
+
+    async def close(self) -> None:
+        self._conn.close()
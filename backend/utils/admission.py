@@ -0,0 +1,244 @@
+"""
+Admission control: per-client token buckets and a global in-flight limit.
+
+Over-limit requests are rejected immediately (429 for a client over its
+rate, 503 when the worker is saturated) with a `Retry-After` header instead
+of queueing behind the database connection pool.
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from jose import JWTError, jwt
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    # Test-friendly imports (when importing `backend.utils.admission`)
+    from backend.config import settings
+except ModuleNotFoundError:
+    # Docker/entrypoint-friendly imports (when running from within `/app`)
+    from config import settings
+
+# Routes that hash passwords (bcrypt) are limited per client IP.
+AUTH_PATH_PREFIX = "/api/auth/"
+# Never limited: load balancer / Docker health checks.
+EXEMPT_PATHS = frozenset({"/api/health"})
+
+
+class BucketStore(ABC):
+    """Token bucket state. `take` returns 0 if a token was taken, else seconds to wait."""
+
+    @abstractmethod
+    def take(self, key: str, rate: float, burst: float, now: float) -> float:
+        """Try to take one token from the bucket `key`."""
+
+
+def _refill(tokens: float, updated: float, rate: float, burst: float, now: float) -> float:
+    return min(burst, tokens + max(0.0, now - updated) * rate)
+
+
+class MemoryBucketStore(BucketStore):
+    """Per-process buckets. Idle (full) buckets are pruned once `max_keys` is reached."""
+
+    def __init__(self, max_keys: int = 10000):
+        # key -> (tokens, updated, rate, burst); each bucket is pruned by its own limits.
+        self._buckets: dict[str, tuple[float, float, float, float]] = {}
+        self._max_keys = max_keys
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: float, now: float) -> float:
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))[:2]
+            tokens = _refill(tokens, updated, rate, burst, now)
+            if tokens >= 1.0:
+                self._buckets[key] = (tokens - 1.0, now, rate, burst)
+                if len(self._buckets) > self._max_keys:
+                    self._prune(now)
+                return 0.0
+            self._buckets[key] = (tokens, now, rate, burst)
+            return (1.0 - tokens) / rate
+
+    def _prune(self, now: float) -> None:
+        self._buckets = {
+            k: (t, u, r, b)
+            for k, (t, u, r, b) in self._buckets.items()
+            if _refill(t, u, r, b, now) < b
+        }
+
+
+class SQLiteBucketStore(BucketStore):
+    """
+    Buckets in a local SQLite file so every gunicorn worker in a container
+    shares one limit. State is disposable, so durability is traded for speed.
+    Runs on the event loop, so lock waits are kept short: if another worker
+    holds the write lock longer, the request is admitted (fail open) rather
+    than stalling every request on this worker. Every `prune_every` takes,
+    rows idle long enough to have refilled are deleted.
+    """
+
+    def __init__(self, path: str, busy_timeout_ms: int = 20, prune_every: int = 1000):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+        self._last_warning = 0.0
+        self._prune_every = prune_every
+        self._takes = 0
+        # Longest time any bucket seen here takes to refill from empty.
+        self._refill_time = 0.0
+
+    def take(self, key: str, rate: float, burst: float, now: float) -> float:
+        with self._lock:
+            try:
+                self._refill_time = max(self._refill_time, burst / rate)
+                self._takes += 1
+                if self._takes % self._prune_every == 0:
+                    self._prune(now)
+                return self._take(key, rate, burst, now)
+            except sqlite3.OperationalError as e:
+                # Locked/busy: admit the request. Warn at most every 10s.
+                if now - self._last_warning >= 10:
+                    self._last_warning = now
+                    print(f"Warning: rate limit store unavailable, admitting requests: {e}")
+                return 0.0
+
+    def _take(self, key: str, rate: float, burst: float, now: float) -> float:
+        c = self._conn
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            row = c.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = _refill(*(row or (burst, now)), rate, burst, now)
+            wait = 0.0 if tokens >= 1.0 else (1.0 - tokens) / rate
+            if not wait:
+                tokens -= 1.0
+            c.execute(
+                "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, "
+                "updated = excluded.updated",
+                (key, tokens, now),
+            )
+            c.execute("COMMIT")
+        except Exception:
+            if c.in_transaction:
+                c.execute("ROLLBACK")
+            raise
+        return wait
+
+    def _prune(self, now: float) -> None:
+        # A missing row is a full bucket, so deleting refilled ones is lossless.
+        self._conn.execute("DELETE FROM buckets WHERE updated < ?", (now - self._refill_time,))
+
+
+def create_bucket_store() -> BucketStore:
+    """Build the bucket store selected by `settings.rate_limit_store`."""
+    if settings.rate_limit_store == "sqlite":
+        return SQLiteBucketStore(settings.rate_limit_sqlite_path)
+    return MemoryBucketStore()
+
+
+def max_inflight_requests() -> int:
+    """Global in-flight limit; defaults to twice the MongoDB pool size."""
+    return settings.max_inflight_requests or settings.mongo_max_pool_size * 2
+
+
+def _header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _client_ip(scope: Scope) -> str:
+    """
+    The address `trusted_proxy_hops` entries from the right of X-Forwarded-For
+    (the peer our outermost proxy saw); entries left of it are client-supplied.
+    """
+    hops = settings.trusted_proxy_hops
+    if hops > 0:
+        forwarded = _header(scope, b"x-forwarded-for")
+        entries = [e.strip() for e in forwarded.split(",")] if forwarded else []
+        if len(entries) >= hops and entries[-hops]:
+            return entries[-hops]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _user_id(scope: Scope) -> str | None:
+    """`user_id` from a valid Bearer token, or None (the route itself will 401)."""
+    auth = _header(scope, b"authorization")
+    if not auth or not auth.lower().startswith("bearer "):
+        return None
+    try:
+        payload = jwt.decode(
+            auth[7:].strip(),
+            settings.jwt_secret,
+            algorithms=[settings.jwt_algorithm],
+        )
+    except JWTError:
+        return None
+    user_id = payload.get("user_id")
+    return str(user_id) if user_id else None
+
+
+def _reject(status_code: int, message: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": message, "status": status_code},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware enforcing per-client rate limits and a global in-flight cap."""
+
+    def __init__(self, app: ASGIApp, store: BucketStore | None = None, max_inflight: int | None = None):
+        self.app = app
+        self.store = store or create_bucket_store()
+        self.max_inflight = max_inflight or max_inflight_requests()
+        self.inflight = 0
+
+    def _check_rate(self, scope: Scope, path: str) -> float:
+        if path.startswith(AUTH_PATH_PREFIX):
+            key = f"auth:{_client_ip(scope)}"
+            rate, burst = settings.rate_limit_auth_rps, settings.rate_limit_auth_burst
+        else:
+            user_id = _user_id(scope)
+            key = f"user:{user_id}" if user_id else f"ip:{_client_ip(scope)}"
+            rate, burst = settings.rate_limit_user_rps, settings.rate_limit_user_burst
+        return self.store.take(key, rate, burst, time.time())
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or scope.get("method") == "OPTIONS"
+            or path in EXEMPT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if self.inflight >= self.max_inflight:
+            await _reject(503, "Server busy, please retry", 1)(scope, receive, send)
+            return
+
+        wait = self._check_rate(scope, path)
+        if wait:
+            await _reject(429, "Too many requests", wait)(scope, receive, send)
+            return
+
+        self.inflight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.inflight -= 1
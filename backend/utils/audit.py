@@ -0,0 +1,210 @@
+"""
+Asynchronous, batched change history for todos (`todo_events`).
+
+Mutating handlers call `audit_log.record(...)`, which only enqueues; a
+background task writes queued events with one `insert_many` per batch, so
+no todo write pays an extra database round trip. The queue is bounded: when
+the database falls behind, handlers wait up to `audit_enqueue_timeout_ms`
+for room (backpressure), then drop the event and count it. Failed batches
+are kept and retried with backoff; event ids make retries idempotent.
+"""
+
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+
+try:
+    # Test-friendly imports (when importing `backend.utils.audit`)
+    from backend.config import settings
+    from backend.storage.base import EventRepository, new_id, to_utc_naive
+except ModuleNotFoundError:
+    # Docker/entrypoint-friendly imports (when running from within `/app`)
+    from config import settings
+    from storage.base import EventRepository, new_id, to_utc_naive
+
+# Cap on the retry delay after a failed batch write.
+_MAX_RETRY_DELAY = 5.0
+
+
+def _plain(fields: dict) -> dict:
+    """Copy of `fields` with datetimes normalized like the Mongo driver does."""
+    return {k: to_utc_naive(v) if isinstance(v, datetime) else v for k, v in fields.items()}
+
+
+class AuditLog:
+    """Bounded in-process queue of todo events plus the task that drains it."""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        maxsize: int = 10000,
+        batch_size: int = 500,
+        flush_interval_ms: int = 200,
+        enqueue_timeout_ms: int = 100,
+        retention_days: int = 90,
+    ):
+        self._enabled = enabled
+        self._maxsize = maxsize
+        self._batch_size = batch_size
+        self._interval = flush_interval_ms / 1000
+        self._enqueue_timeout = enqueue_timeout_ms / 1000
+        self._retention = timedelta(days=retention_days)
+        # Created in `start` so they bind to the running loop.
+        self._queue: asyncio.Queue | None = None
+        self._lock: asyncio.Lock | None = None
+        # Events taken off the queue but not yet written (retried first).
+        self._held: list[dict] = []
+        # (user_id, todo_id) -> events queued or held but not yet written.
+        self._unwritten: Counter = Counter()
+        self._repo: EventRepository | None = None
+        self._task: asyncio.Task | None = None
+        self._failures = 0
+        self.written = 0
+        self.overflows = 0
+        self.dropped = 0
+        self.write_errors = 0
+
+    def stats(self) -> dict:
+        """Counters for monitoring (exposed by the health endpoint)."""
+        return {
+            "queued": (self._queue.qsize() if self._queue else 0) + len(self._held),
+            "written": self.written,
+            "overflows": self.overflows,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors,
+        }
+
+    async def record(
+        self,
+        user_id: str,
+        todo_id: str,
+        action: str,
+        changes: dict,
+        previous: dict | None = None,
+        at: datetime | None = None,
+    ) -> None:
+        """
+        Enqueue one event. Returns immediately unless the queue is full, in
+        which case it waits up to the enqueue timeout, then drops the event.
+        """
+        if self._queue is None:
+            return
+        at = to_utc_naive(at) if at else datetime.utcnow()
+        event = {
+            "_id": new_id(),
+            "user_id": user_id,
+            "todo_id": todo_id,
+            "action": action,
+            "changes": _plain(changes),
+            "previous": _plain(previous) if previous is not None else None,
+            "at": at,
+            "expires_at": at + self._retention,
+        }
+        try:
+            self._queue.put_nowait(event)
+            self._unwritten[(user_id, todo_id)] += 1
+            return
+        except asyncio.QueueFull:
+            self.overflows += 1
+        try:
+            await asyncio.wait_for(self._queue.put(event), timeout=self._enqueue_timeout)
+            self._unwritten[(user_id, todo_id)] += 1
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                print(f"Warning: todo event queue full, {self.dropped} event(s) dropped so far")
+
+    async def _write_queued(self, limit: int | None = None) -> None:
+        async with self._lock:
+            batch, self._held = self._held, []
+            while not self._queue.empty() and (limit is None or len(batch) < limit):
+                batch.append(self._queue.get_nowait())
+            for start in range(0, len(batch), self._batch_size):
+                chunk = batch[start:start + self._batch_size]
+                try:
+                    await self._repo.insert_many(chunk)
+                except BaseException as e:
+                    # Keep this chunk and the rest for the next attempt.
+                    self._held = batch[start:] + self._held
+                    if isinstance(e, Exception):
+                        self.write_errors += 1
+                    raise
+                self.written += len(chunk)
+                for e in chunk:
+                    key = (e["user_id"], e["todo_id"])
+                    self._unwritten[key] -= 1
+                    if self._unwritten[key] <= 0:
+                        del self._unwritten[key]
+
+    async def flush(self) -> None:
+        """Write every queued event now."""
+        if self._queue is not None:
+            await self._write_queued()
+
+    async def flush_for(self, user_id: str, todo_id: str, timeout: float = 1.0) -> None:
+        """
+        Before a history read: if this worker still holds unwritten events of
+        this todo, write the queue now (waiting at most `timeout`). On failure
+        the events stay queued for the background writer.
+        """
+        if self._queue is None or not self._unwritten[(user_id, todo_id)]:
+            return
+        try:
+            await asyncio.wait_for(self.flush(), timeout=timeout)
+        except Exception as e:
+            print(f"Warning: writing queued todo events before a history read failed: {e!r}")
+
+    async def _run(self) -> None:
+        while True:
+            if not self._held:
+                event = await self._queue.get()
+                self._held.append(event)
+            # Give a partial batch one interval to fill up.
+            if self._queue.qsize() + len(self._held) < self._batch_size:
+                await asyncio.sleep(self._interval)
+            try:
+                await self._write_queued(self._batch_size)
+            except Exception as e:
+                self._failures += 1
+                delay = min(self._interval * 2 ** self._failures, _MAX_RETRY_DELAY)
+                print(f"Warning: writing todo events failed, retrying in {delay:.2f}s: {e}")
+                await asyncio.sleep(delay)
+            else:
+                self._failures = 0
+
+    async def start(self, repo: EventRepository) -> None:
+        """Create the queue and start draining it into `repo` (no-op if disabled)."""
+        if not self._enabled:
+            return
+        self._repo = repo
+        self._queue = asyncio.Queue(maxsize=self._maxsize)
+        self._lock = asyncio.Lock()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Stop the drain task and write whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self.flush(), timeout=timeout)
+        except Exception as e:
+            print(f"Warning: {self.stats()['queued']} todo event(s) not written on shutdown: {e!r}")
+        self._queue = None
+
+
+# Process-wide audit log fed by the todo routes.
+audit_log = AuditLog(
+    enabled=settings.audit_log_enabled,
+    maxsize=settings.audit_queue_size,
+    batch_size=settings.audit_batch_size,
+    flush_interval_ms=settings.audit_flush_interval_ms,
+    enqueue_timeout_ms=settings.audit_enqueue_timeout_ms,
+    retention_days=settings.audit_retention_days,
+)
@@ -1,5 +1,7 @@
 """JWT creation/validation and password hashing."""
 
+import secrets
+import time
 from datetime import datetime, timedelta
 
 from fastapi import HTTPException, status
@@ -27,10 +29,15 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 def create_access_token(data: dict) -> str:
-    """Create a JWT access token."""
+    """
+    Create a JWT access token. `jti` identifies it for revocation; `iat`
+    keeps sub-second precision so revoke-all cutoffs are exact.
+    """
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.jwt_expiry_days)
     to_encode["exp"] = expire
+    to_encode["iat"] = time.time()
+    to_encode["jti"] = secrets.token_urlsafe(16)
     encoded_jwt = jwt.encode(
         to_encode,
         settings.jwt_secret,
@@ -6,25 +6,41 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 try:
     # Test-friendly imports (when importing `backend.utils.deps`)
     from backend.utils.auth import verify_token
+    from backend.utils.revocation import revocation_list
 except ModuleNotFoundError:
     # Docker/entrypoint-friendly imports (when running from within `/app`)
     from utils.auth import verify_token
+    from utils.revocation import revocation_list
 
 # Declares Bearer auth in OpenAPI so Swagger UI sends Authorization correctly
 # (plain Header(...) is often omitted from generated requests in Swagger UI).
 security = HTTPBearer()
 
 
-async def get_current_user(
+async def get_token_payload(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-) -> str:
+) -> dict:
     """
     Extract and validate JWT from Authorization header.
-    Returns user_id (string) from token payload.
-    Raises HTTPException(401) if missing or invalid.
+    Returns the token payload.
+    Raises HTTPException(401) if missing, invalid or revoked (checked against
+    the in-memory revocation list, no database query).
     """
     token = credentials.credentials
     payload = verify_token(token)
+    if revocation_list.is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+        )
+    return payload
+
+
+async def get_current_user(payload: dict = Depends(get_token_payload)) -> str:
+    """
+    Returns user_id (string) from a valid, unrevoked token.
+    Raises HTTPException(401) if missing or invalid.
+    """
     user_id = payload.get("user_id")
     if not user_id:
         raise HTTPException(
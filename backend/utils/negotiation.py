@@ -0,0 +1,197 @@
+"""
+Content negotiation: MessagePack request/response bodies and gzip/brotli
+response compression.
+"""
+
+import email.message
+import gzip
+from typing import Any, Callable, Coroutine
+
+import brotli
+import msgpack
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_ALIASES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+
+# Only these are worth compressing; everything else is passed through.
+COMPRESSIBLE_TYPES = ("application/json", MSGPACK_MEDIA_TYPE, "text/")
+
+
+def _qualities(header: str) -> dict[str, float]:
+    """Lower-cased token -> q value of an Accept/Accept-Encoding header."""
+    qualities = {}
+    for part in header.split(","):
+        token, *params = part.split(";")
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[token.strip().lower()] = q
+    return qualities
+
+
+def _accepted(header: str) -> set[str]:
+    """Lower-cased tokens of an Accept/Accept-Encoding header, minus those with q=0."""
+    return {token for token, q in _qualities(header).items() if q > 0}
+
+
+def _is_msgpack(content_type: str | None) -> bool:
+    if not content_type:
+        return False
+    message = email.message.Message()
+    message["content-type"] = content_type
+    return message.get_content_type() in _MSGPACK_ALIASES
+
+
+def wants_msgpack(accept: str | None) -> bool:
+    """True if the Accept header lists a MessagePack type (with q > 0)."""
+    if not accept:
+        return False
+    return not _accepted(accept).isdisjoint(_MSGPACK_ALIASES)
+
+
+class MsgPackResponse(Response):
+    """Response rendered with MessagePack instead of JSON."""
+
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, use_bin_type=True)
+
+
+class MsgPackRequest(Request):
+    """
+    Request whose MessagePack body is exposed through `json()`. The content
+    type is rewritten to JSON so FastAPI's body parsing picks it up as usual.
+    """
+
+    def __init__(self, scope: Scope, receive: Receive):
+        headers = [
+            (k, b"application/json") if k == b"content-type" else (k, v)
+            for k, v in scope.get("headers", [])
+        ]
+        super().__init__({**scope, "headers": headers}, receive)
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = msgpack.unpackb(await self.body(), raw=False)
+        return self._json
+
+
+class NegotiatedRoute(APIRoute):
+    """
+    Route that accepts `Content-Type: application/msgpack` bodies and renders
+    `Accept: application/msgpack` responses directly as MessagePack (no JSON
+    round trip). Errors keep the usual JSON `{error, status}` format. Every
+    response carries `Vary: Accept` so shared caches keep the formats apart.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        json_handler = super().get_route_handler()
+        response_class = self.response_class
+        self.response_class = MsgPackResponse
+        try:
+            msgpack_handler = super().get_route_handler()
+        finally:
+            self.response_class = response_class
+
+        async def handler(request: Request) -> Response:
+            if _is_msgpack(request.headers.get("content-type")):
+                request = MsgPackRequest(request.scope, request.receive)
+            if wants_msgpack(request.headers.get("accept")):
+                response = await msgpack_handler(request)
+            else:
+                response = await json_handler(request)
+            response.headers.add_vary_header("Accept")
+            return response
+
+        return handler
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """Pick "br" or "gzip" from an Accept-Encoding header (brotli preferred)."""
+    if not accept_encoding:
+        return None
+    qualities = _qualities(accept_encoding)
+    for coding in ("br", "gzip"):
+        # `*` only covers codings the header doesn't name (e.g. not `br;q=0`).
+        if qualities.get(coding, qualities.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Compress complete (non-streaming) responses of a compressible type once
+    they reach `minimum_size` bytes. Smaller bodies aren't worth the CPU.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def compress(self, body: bytes, coding: str) -> bytes:
+        if coding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if passthrough or message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            content_type = headers.get("content-type", "")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or len(body) < self.minimum_size
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                # Streaming, already encoded, too small or not compressible.
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            body = self.compress(body, coding)
+            headers["Content-Encoding"] = coding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,124 @@
+"""
+Per-worker denylist of revoked sessions.
+
+Revocations are stored through the storage engine and mirrored here, so
+`get_current_user` checks a token against in-memory sets instead of a
+database round trip. A background task polls for revocations recorded since
+the last refresh; one made on another worker takes effect here within
+`revocation_refresh_seconds`, one made on this worker immediately.
+"""
+
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+
+try:
+    # Test-friendly imports (when importing `backend.utils.revocation`)
+    from backend.storage.base import RevocationRepository
+except ModuleNotFoundError:
+    # Docker/entrypoint-friendly imports (when running from within `/app`)
+    from storage.base import RevocationRepository
+
+# Each poll re-reads this much history, so revocations that become visible
+# slightly out of `revoked_at` order are not missed. Re-applying is harmless.
+_POLL_OVERLAP = timedelta(seconds=5)
+
+
+def _key(jti: str) -> int:
+    """64-bit hash of a jti: a fraction of the string's memory, no false negatives."""
+    return int.from_bytes(hashlib.blake2b(jti.encode(), digest_size=8).digest(), "big")
+
+
+class RevocationList:
+    """Hashed set of revoked jtis plus per-user revoke-all cutoffs."""
+
+    def __init__(self):
+        # hashed jti -> token expiry (dropped once the token is dead anyway).
+        self._jtis: dict[int, datetime] = {}
+        # user_id -> (tokens issued before this are revoked, cutoff expiry).
+        self._cutoffs: dict[str, tuple[datetime, datetime]] = {}
+        self._since: datetime | None = None
+        self._repo: RevocationRepository | None = None
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._jtis) + len(self._cutoffs)
+
+    def add(self, entry: dict) -> None:
+        """Apply one revocation (shaped like `RevocationRepository.changes_since` rows)."""
+        if entry.get("jti") is not None:
+            self._jtis[_key(entry["jti"])] = entry["expires_at"]
+            return
+        issued_before, expires_at = entry["issued_before"], entry["expires_at"]
+        previous = self._cutoffs.get(entry["user_id"])
+        if previous is not None:
+            issued_before = max(issued_before, previous[0])
+            expires_at = max(expires_at, previous[1])
+        self._cutoffs[entry["user_id"]] = (issued_before, expires_at)
+
+    def is_revoked(self, payload: dict) -> bool:
+        """True if a verified token payload has been revoked."""
+        jti = payload.get("jti")
+        if jti is not None and _key(jti) in self._jtis:
+            return True
+        cutoff = self._cutoffs.get(str(payload.get("user_id")))
+        if cutoff is None:
+            return False
+        iat = payload.get("iat")
+        # Tokens issued before jti/iat were added can't be dated: revoke them.
+        return iat is None or datetime.utcfromtimestamp(iat) < cutoff[0]
+
+    def _prune(self, now: datetime) -> None:
+        for key in [k for k, expires_at in self._jtis.items() if expires_at <= now]:
+            del self._jtis[key]
+        for user_id in [u for u, (_, expires_at) in self._cutoffs.items() if expires_at <= now]:
+            del self._cutoffs[user_id]
+
+    async def refresh(self) -> int:
+        """Fetch revocations recorded since the last refresh. Returns how many were read."""
+        if self._repo is None:
+            return 0
+        entries = await self._repo.changes_since(self._since)
+        for entry in entries:
+            self.add(entry)
+        if entries:
+            since = max(entry["revoked_at"] for entry in entries) - _POLL_OVERLAP
+            if self._since is None or since > self._since:
+                self._since = since
+        self._prune(datetime.utcnow())
+        return len(entries)
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Warning: revocation list refresh failed: {e}")
+
+    async def start(self, repo: RevocationRepository, interval: float, timeout: float = 2.0) -> None:
+        """
+        Load all unexpired revocations, then keep refreshing in the background.
+        If the initial load fails the worker still starts and the loop retries.
+        """
+        self._repo = repo
+        try:
+            count = await asyncio.wait_for(self.refresh(), timeout=timeout)
+            print(f"Revocation list loaded ({count} entries)")
+        except Exception as e:
+            print(f"Warning: could not load revoked sessions, retrying in background: {e}")
+        self._task = asyncio.get_running_loop().create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        """Stop the background refresh."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Process-wide denylist consulted by `get_current_user`.
+revocation_list = RevocationList()
@@ -23,12 +23,25 @@ if [ -z "$JWT_SECRET" ]; then
     exit 1
 fi
 
+# The memory engine keeps todos inside each worker process
+WORKERS="${WEB_CONCURRENCY:-4}"
+if [ "${STORAGE_ENGINE:-mongo}" = "memory" ] && [ "$WORKERS" -gt 1 ]; then
+    echo "ERROR: STORAGE_ENGINE=memory is per-process; set WEB_CONCURRENCY=1 (got $WORKERS)"
+    exit 1
+fi
+
 echo "Environment variables OK"
 
+# Apply schema migrations once per container (not once per worker)
+if [ "${RUN_MIGRATIONS:-true}" = "true" ]; then
+    echo "Applying schema migrations..."
+    python migrate.py || echo "WARNING: migrations failed; workers will start with a version warning"
+fi
+
 # Start application with Gunicorn + Uvicorn workers
 echo "Starting FastAPI application..."
 exec gunicorn \
-    --workers 4 \
+    --workers "$WORKERS" \
     --worker-class uvicorn.workers.UvicornWorker \
     --bind 0.0.0.0:8000 \
     --timeout 120 \